@@ -0,0 +1,113 @@
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Optional, Tuple
+
+# date.toordinal() of the NumPy datetime64 epoch, 1970-01-01
+_EPOCH_ORDINAL = 719163
+
+
+class ActivityLog:
+    """Sorted log of the days one kind of activity (e.g. workouts) happened.
+
+    Days are kept as ordinals in an int array, once each however many
+    events they had, so recording today updates the current and longest
+    streak in O(1) and a repeat leaves the log as it is. Range queries
+    are two binary searches; gap and per-month queries use NumPy over
+    the array.
+    """
+
+    def __init__(self, ordinals: Iterable[int] = ()):
+        # set(): logs saved before repeats were dropped may list a day twice
+        self.dates = array("i", sorted(set(ordinals)))
+        self.current = 0  # length of the run of consecutive days ending at the last event
+        self.longest = 0
+        self._recount()
+
+    def record(self, date: datetime.date) -> int:
+        """Log one event; returns the streak it belongs to"""
+        ordinal = date.toordinal()
+        last = self.dates[-1] if self.dates else None
+        if last is not None and ordinal < last:
+            # Out of order: keep the array sorted and count the runs again
+            i = bisect_left(self.dates, ordinal)
+            if self.dates[i] != ordinal:
+                self.dates.insert(i, ordinal)
+                self._recount()
+            return self.current
+        if ordinal == last:
+            return self.current
+        if last is None or ordinal > last + 1:
+            self.current = 1
+        elif ordinal == last + 1:
+            self.current += 1
+        self.dates.append(ordinal)
+        if self.current > self.longest:
+            self.longest = self.current
+        return self.current
+
+    def backfill(self, dates: Iterable[datetime.date]):
+        """Merge many past events at once, e.g. a year imported from a tracker"""
+        self.dates = array("i", sorted(set(self.dates).union(date.toordinal() for date in dates)))
+        self._recount()
+
+    def _recount(self):
+        # One pass over the sorted dates, O(n); only needed after bulk or out-of-order changes
+        current = longest = 0
+        previous = None
+        for ordinal in self.dates:
+            current = current + 1 if previous is not None and ordinal == previous + 1 else 1
+            longest = max(longest, current)
+            previous = ordinal
+        self.current, self.longest = current, longest
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def ordinals(self) -> List[int]:
+        """JSON-friendly copy of the log, see ActivityLog(ordinals)"""
+        return self.dates.tolist()
+
+    @property
+    def last_date(self) -> Optional[datetime.date]:
+        return datetime.date.fromordinal(self.dates[-1]) if self.dates else None
+
+    def current_streak(self, today: datetime.date) -> int:
+        """The current streak, or 0 if it was broken before yesterday"""
+        if self.dates and self.dates[-1] >= today.toordinal() - 1:
+            return self.current
+        return 0
+
+    def count(self, start: datetime.date, end: datetime.date) -> int:
+        """Active days from start to end, both inclusive"""
+        return bisect_right(self.dates, end.toordinal()) - bisect_left(self.dates, start.toordinal())
+
+    def weekly_counts(self, weeks: int, today: datetime.date) -> List[Tuple[datetime.date, int]]:
+        """(Monday, active days that week) for the last `weeks` weeks, oldest first"""
+        monday = today - datetime.timedelta(days=today.weekday())
+        result = []
+        for back in range(weeks - 1, -1, -1):
+            start = monday - datetime.timedelta(weeks=back)
+            result.append((start, self.count(start, start + datetime.timedelta(days=6))))
+        return result
+
+    def gaps(self, min_days: int = 2, start: Optional[datetime.date] = None,
+             end: Optional[datetime.date] = None) -> List[Tuple[datetime.date, datetime.date, int]]:
+        """(last active day, next active day, days missed) for every break of at least min_days"""
+        import numpy as np  # only needed for queries, keep it off the import path
+        lo = bisect_left(self.dates, start.toordinal()) if start else 0
+        hi = bisect_right(self.dates, end.toordinal()) if end else len(self.dates)
+        days = np.frombuffer(self.dates, dtype=np.intc)[lo:hi]
+        missed = np.diff(days) - 1
+        return [(datetime.date.fromordinal(int(days[i])), datetime.date.fromordinal(int(days[i + 1])),
+                 int(missed[i])) for i in np.flatnonzero(missed >= min_days)]
+
+    def best_month(self) -> Optional[Tuple[int, int, int]]:
+        """(year, month, active days) of the most active month; the earliest wins ties"""
+        import numpy as np
+        if not self.dates:
+            return None
+        days = (np.frombuffer(self.dates, dtype=np.intc) - _EPOCH_ORDINAL).astype("datetime64[D]")
+        months, counts = np.unique(days.astype("datetime64[M]"), return_counts=True)
+        best = months[counts.argmax()].astype(object)
+        return best.year, best.month, int(counts.max())
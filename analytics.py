@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Streaming analytics over exported conversation logs
+
+    python analytics.py turns-*.jsonl --processes 4
+    python analytics.py turns.jsonl --json summary.json
+
+Reads the JSONL turn records written by conversation_log.TurnExporter
+(or ConversationMemory spill files) one line at a time, so memory use
+depends on the number of distinct intents, weeks and context values,
+never on the size of the logs. Plain files are split into byte ranges
+and every range is summarized in a process pool, then the partial
+summaries are merged.
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Intents of turns nothing specific matched: the enhanced bot's general
+# reply and the legacy rules' default
+FALLBACK_INTENTS = ("fallback", "unknown")
+TIME_BUCKETS = [(10, "up to 10 min"), (20, "11-20 min"), (30, "21-30 min"), (60, "31-60 min"),
+                (None, "over 60 min")]
+CHUNK_BYTES = 64 * 1024 * 1024
+
+Chunk = Tuple[str, int, Optional[int]]
+
+
+def iter_records(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Optional[Dict]]:
+    """Yield the records of the lines that start in [start, end); None for a malformed line.
+
+    A line belongs to the range its first byte falls in, so adjacent
+    ranges of one file cover every line exactly once. Gzipped files are
+    always read whole.
+    """
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            yield from _parse(iter(f.readline, b""))
+        return
+    with open(path, "rb") as f:
+        if start:
+            # Skip the line that started in the previous range
+            f.seek(start - 1)
+            f.readline()
+        yield from _parse(_lines_until(f, end))
+
+
+def _lines_until(f, end: Optional[int]) -> Iterator[bytes]:
+    while end is None or f.tell() < end:
+        line = f.readline()
+        if not line:
+            return
+        yield line
+
+
+def _parse(lines: Iterator[bytes]) -> Iterator[Optional[Dict]]:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        yield record if isinstance(record, dict) else None
+
+
+def time_bucket(minutes: int) -> str:
+    for limit, label in TIME_BUCKETS:
+        if limit is None or minutes <= limit:
+            return label
+
+
+class Summary:
+    """Mergeable counters over turn records"""
+
+    def __init__(self):
+        self.turns = 0
+        self.bad_records = 0
+        self.intents: Counter = Counter()
+        self.moods: Counter = Counter()  # (ISO date of the week's Monday, mood) -> turns
+        self.context: Dict[str, Counter] = defaultdict(Counter)
+        self._weeks: Dict[str, str] = {}  # day -> its week; bounded by the days in the logs
+
+    def add(self, record: Optional[Dict]):
+        if record is None:
+            self.bad_records += 1
+            return
+        self.turns += 1
+        self.intents[record.get("intent") or "unrecorded"] += 1
+        context = record.get("context") or {}
+        for feature, value in context.items():
+            if feature == "mood":
+                self.moods[self._week(record.get("timestamp")), value] += 1
+            elif feature == "time" and isinstance(value, int):
+                self.context[feature][time_bucket(value)] += 1
+            else:
+                self.context[feature][str(value)] += 1
+
+    def _week(self, timestamp: Optional[str]) -> str:
+        day = (timestamp or "")[:10]
+        week = self._weeks.get(day)
+        if week is None:
+            try:
+                date = datetime.date.fromisoformat(day)
+                week = (date - datetime.timedelta(days=date.weekday())).isoformat()
+            except ValueError:
+                week = "unknown"
+            self._weeks[day] = week
+        return week
+
+    def merge(self, other: 'Summary') -> 'Summary':
+        self.turns += other.turns
+        self.bad_records += other.bad_records
+        self.intents.update(other.intents)
+        self.moods.update(other.moods)
+        for feature, counts in other.context.items():
+            self.context[feature].update(counts)
+        return self
+
+    @property
+    def fallbacks(self) -> int:
+        return sum(self.intents[intent] for intent in FALLBACK_INTENTS)
+
+    @property
+    def fallback_rate(self) -> float:
+        return self.fallbacks / self.turns if self.turns else 0.0
+
+    def mood_trends(self) -> Dict[str, Dict[str, int]]:
+        """week -> mood -> turns, weeks in order"""
+        trends: Dict[str, Dict[str, int]] = {}
+        for (week, mood), count in sorted(self.moods.items()):
+            trends.setdefault(week, {})[mood] = count
+        return trends
+
+    def to_dict(self) -> Dict:
+        return {
+            "turns": self.turns,
+            "bad_records": self.bad_records,
+            "fallbacks": self.fallbacks,
+            "fallback_rate": round(self.fallback_rate, 4),
+            "intents": dict(self.intents.most_common()),
+            "mood_trends": self.mood_trends(),
+            "context": {feature: dict(counts.most_common()) for feature, counts in sorted(self.context.items())},
+        }
+
+    def tables(self) -> str:
+        """Plain-text summary tables"""
+        lines = [f"Turns: {self.turns}   Fallbacks: {self.fallbacks} ({self.fallback_rate:.1%})"
+                 f"   Bad records: {self.bad_records}", "", f"{'intent':<24}{'turns':>10}{'share':>9}"]
+        for intent, count in self.intents.most_common():
+            lines.append(f"{intent:<24}{count:>10}{count / self.turns:>9.1%}")
+
+        trends = self.mood_trends()
+        if trends:
+            moods = sorted({mood for _, mood in self.moods})
+            lines += ["", "mood by week".ljust(14) + "".join(f"{mood:>10}" for mood in moods)]
+            for week, counts in trends.items():
+                lines.append(week.ljust(14) + "".join(f"{counts.get(mood, 0):>10}" for mood in moods))
+
+        for feature, counts in sorted(self.context.items()):
+            total = sum(counts.values())
+            lines += ["", f"{feature:<24}{'turns':>10}{'share':>9}"]
+            for value, count in sorted(counts.items(), key=_value_order):
+                lines.append(f"{value:<24}{count:>10}{count / total:>9.1%}")
+        return "\n".join(lines)
+
+
+def _value_order(item: Tuple[str, int]):
+    # Numbers (energy levels) in numeric order, time buckets in bucket order, the rest by name
+    value = item[0]
+    labels = [label for _, label in TIME_BUCKETS]
+    if value in labels:
+        return 0, labels.index(value), ""
+    if value.isdecimal():
+        return 0, int(value), ""
+    return 1, 0, value
+
+
+def summarize_chunk(chunk: Chunk) -> Summary:
+    summary = Summary()
+    for record in iter_records(*chunk):
+        summary.add(record)
+    return summary
+
+
+def plan_chunks(paths: Sequence[str], chunk_bytes: int = CHUNK_BYTES) -> List[Chunk]:
+    """Byte ranges covering every file; gzipped files stay whole"""
+    chunks = []
+    for path in paths:
+        size = os.path.getsize(path)
+        if path.endswith(".gz") or size <= chunk_bytes:
+            chunks.append((path, 0, None))
+            continue
+        for start in range(0, size, chunk_bytes):
+            chunks.append((path, start, start + chunk_bytes))
+    return chunks
+
+
+def summarize(paths: Sequence[str], processes: Optional[int] = None,
+              chunk_bytes: int = CHUNK_BYTES) -> Summary:
+    """Summarize many log files; processes=1 stays in this process"""
+    chunks = plan_chunks(paths, chunk_bytes)
+    total = Summary()
+    if processes == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            total.merge(summarize_chunk(chunk))
+        return total
+    with ProcessPoolExecutor(processes) as executor:
+        for partial in executor.map(summarize_chunk, chunks):
+            total.merge(partial)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize exported conversation logs")
+    parser.add_argument("paths", nargs="+", help="JSONL (or .jsonl.gz) turn logs")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: one per core, 1: no pool)")
+    parser.add_argument("--chunk-mb", type=int, default=CHUNK_BYTES // (1024 * 1024),
+                        help="split plain files into ranges of this size")
+    parser.add_argument("--json", help="also write the summary to this JSON file")
+    args = parser.parse_args()
+
+    result = summarize(args.paths, args.processes, args.chunk_mb * 1024 * 1024)
+    print(result.tables())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result.to_dict(), f, indent=2, ensure_ascii=False)
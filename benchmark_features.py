@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Per-feature micro-benchmarks built from the demo_features.py scenarios
+Reports p50/p99 latency and allocations per call, saves the results as
+JSON and flags regressions against an earlier run:
+
+    python benchmark_features.py --output before.json
+    ... change the engine ...
+    python benchmark_features.py --output after.json --compare before.json
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from array import array
+from typing import Callable, Dict, List, Tuple
+
+import chatbot
+from enhanced_bot import EnhancedFitnessBot, UserProfile
+from metrics import metrics
+
+# A fixed clock and seed keep time- and random-dependent branches stable between runs
+BENCH_TIME = datetime.datetime(2024, 6, 12, 9, 30)
+BENCH_SEED = 42
+
+# Metrics checked by --compare: (smallest change worth reporting, multiple of
+# --threshold allowed). Tail latency is noisier, so it gets twice the slack.
+REGRESSION_METRICS = {
+    "p50_us": (1.0, 1),
+    "p99_us": (5.0, 2),
+    "alloc_peak_bytes": (256, 1),
+}
+
+Scenario = Callable[[EnhancedFitnessBot, UserProfile], List[Callable[[], object]]]
+
+
+def _extract_context(bot, profile):
+    inputs = [
+        "I'm tired, give me a quick workout",
+        "I'm energetic and have 45 minutes",
+        "I'm feeling okay, 20 minute workout",
+        "I'm feeling 😴 today",
+        "Ready to workout 💪",
+        "Need some motivation 😔",
+    ]
+    return [lambda text=text: bot.extract_context(text) for text in inputs]
+
+
+def _dynamic_workout(bot, profile):
+    contexts = [bot.extract_context(text) for text in (
+        "I'm tired, give me a quick workout",
+        "I have 5 minutes",
+        "I have an hour to exercise",
+    )] + [{"time": 10, "energy": 8}, {"time": 30, "energy": 5}, {"time": 60, "energy": 7}]
+    return [lambda context=context: bot.generate_dynamic_workout(context, profile) for context in contexts]
+
+
+def _meal_suggestion(bot, profile):
+    contexts = [bot.extract_context(text) for text in (
+        "I need a budget breakfast",
+        "Suggest an expensive dinner",
+        "What's a good lunch?",
+    )]
+    return [lambda context=context: bot.generate_meal_suggestion(context, profile) for context in contexts]
+
+
+def _hydration(bot, profile):
+    return [lambda context=context: bot.hydration_intelligence(context)
+            for context in ({"energy": 8}, {"energy": 4}, {})]
+
+
+def _mood_correlation(bot, profile):
+    return [lambda mood=mood: bot.mood_fitness_correlation(mood, profile)
+            for mood in ("stressed", "sad", "anxious", "angry", "tired", "excited")]
+
+
+def _smart_goals(bot, profile):
+    return [lambda goal=goal: bot.generate_smart_goals(goal) for goal in (
+        "I want to lose weight",
+        "I want to get fit",
+        "I want to build muscle",
+        "I want to eat healthy",
+    )]
+
+
+def _memory_append(bot, profile):
+    return [lambda: bot.conversation_memory.append("Give me a workout", "Here is a workout plan...",
+                                                   {"energy": 7})]
+
+
+def _exercise_variation(bot, profile):
+    return [lambda exercise=exercise: bot.exercise_variation_engine(exercise, profile)
+            for exercise in ("squats", "pushups", "planks")]
+
+
+def _weekly_challenge(bot, profile):
+    return [bot.generate_weekly_challenge]
+
+
+def _track_streaks(bot, profile):
+    return [lambda kind=kind: bot.track_streaks(kind, profile) for kind in ("workout", "nutrition")]
+
+
+def _reminders(bot, profile):
+    return [lambda: bot.intelligent_reminders(profile)]
+
+
+def _recovery(bot, profile):
+    profile.workout_streak = 6
+    return [lambda context=context: bot.recovery_optimization(context, profile)
+            for context in ({"energy": 2}, {"energy": 5}, {"energy": 8})]
+
+
+RULE_INPUTS = [
+    "hi there",
+    "Give me a workout plan",
+    "healthy breakfast ideas?",
+    "how much sleep do I need",
+    "I can't sleep at night",
+    "what is the weather like",
+]
+
+
+def _rule_match(bot, profile):
+    # Bypasses the lru_cache so every call runs the matcher itself
+    cleaned = [chatbot.clean_input(text) for text in RULE_INPUTS]
+    return [lambda text=text: chatbot.match_rule.__wrapped__(text) for text in cleaned]
+
+
+def _chatbot_response(bot, profile):
+    return [lambda text=text: chatbot.get_chatbot_response(text, bot, profile)
+            for text in RULE_INPUTS + ["I'm tired, give me a quick 10-minute workout",
+                                       "budget-friendly dinner ideas",
+                                       "I feel stressed"]]
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "extract_context": _extract_context,
+    "generate_dynamic_workout": _dynamic_workout,
+    "generate_meal_suggestion": _meal_suggestion,
+    "hydration_intelligence": _hydration,
+    "mood_fitness_correlation": _mood_correlation,
+    "generate_smart_goals": _smart_goals,
+    "conversation_memory": _memory_append,
+    "exercise_variation_engine": _exercise_variation,
+    "generate_weekly_challenge": _weekly_challenge,
+    "track_streaks": _track_streaks,
+    "intelligent_reminders": _reminders,
+    "recovery_optimization": _recovery,
+    "rule_match": _rule_match,
+    "get_chatbot_response": _chatbot_response,
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _calls(scenario: Scenario) -> List[Callable[[], object]]:
+    bot = EnhancedFitnessBot(clock=lambda: BENCH_TIME, seed=BENCH_SEED)
+    return scenario(bot, UserProfile())
+
+
+def measure(scenario: Scenario, iterations: int, alloc_iterations: int, repeat: int = 5) -> Dict:
+    """Latency samples per call, then a separate traced pass for allocations"""
+    calls = _calls(scenario)
+    for call in calls:
+        call()  # warm-up
+
+    # Timed in several rounds and each statistic is the best across rounds, so a
+    # noisy neighbour or a frequency change during one round doesn't read as a regression
+    timer = time.perf_counter_ns
+    rounds = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # as timeit does, so collections don't land on random calls
+    try:
+        for _ in range(repeat):
+            samples = []
+            for _ in range(max(1, iterations // repeat)):
+                for call in calls:
+                    start = timer()
+                    call()
+                    samples.append((timer() - start) / 1000)
+            samples.sort()
+            rounds.append(samples)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # tracemalloc slows every allocation down, so it never overlaps the timed loop
+    calls = _calls(scenario)
+    for call in calls:
+        call()
+    # Preallocated so recording a sample doesn't count as an allocation
+    peaks = array("q", bytes(8 * alloc_iterations * len(calls)))
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        sample = 0
+        for _ in range(alloc_iterations):
+            for call in calls:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                call()
+                peaks[sample] = tracemalloc.get_traced_memory()[1] - before
+                sample += 1
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": sum(map(len, rounds)),
+        "p50_us": round(min(percentile(samples, 0.50) for samples in rounds), 3),
+        "p99_us": round(min(percentile(samples, 0.99) for samples in rounds), 3),
+        "mean_us": round(min(statistics.fmean(samples) for samples in rounds), 3),
+        "alloc_peak_bytes": round(statistics.fmean(peaks)),
+        "retained_bytes_per_call": round(retained / len(peaks), 1),
+    }
+
+
+def run(names: List[str], iterations: int, alloc_iterations: int, repeat: int = 5) -> Dict:
+    results = {name: measure(SCENARIOS[name], iterations, alloc_iterations, repeat) for name in names}
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "alloc_iterations": alloc_iterations,
+            "repeat": repeat,
+            "metrics_enabled": metrics.enabled,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Tuple[str, str, float, float]]:
+    """Return (scenario, metric, old, new) for every metric that got worse than the threshold"""
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        for metric, (min_delta, slack) in REGRESSION_METRICS.items():
+            before, after = old.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            if after - before > max(min_delta, before * threshold * slack):
+                regressions.append((name, metric, before, after))
+    return regressions
+
+
+def print_results(report: Dict, baseline: Dict = None):
+    header = f"{'scenario':28} {'p50 µs':>9} {'p99 µs':>9} {'mean µs':>9} {'peak B':>8} {'kept B':>8}"
+    if baseline:
+        header += f" {'Δp50':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, result in report["results"].items():
+        line = (f"{name:28} {result['p50_us']:9.1f} {result['p99_us']:9.1f} {result['mean_us']:9.1f} "
+                f"{result['alloc_peak_bytes']:8d} {result['retained_bytes_per_call']:8.0f}")
+        old = baseline["results"].get(name) if baseline else None
+        if old and old["p50_us"]:
+            line += f" {(result['p50_us'] / old['p50_us'] - 1) * 100:+7.1f}%"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-feature micro-benchmarks for the chatbot engine")
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), metavar="SCENARIO",
+                        help="run just these scenarios")
+    parser.add_argument("--iterations", type=int, default=2000, help="timed rounds per scenario")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="split the timed rounds into this many runs and report the best")
+    parser.add_argument("--alloc-iterations", type=int, default=50,
+                        help="rounds traced with tracemalloc per scenario")
+    parser.add_argument("--metrics", action="store_true",
+                        help="run with stage instrumentation on, to measure its overhead")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown / allocation growth before failing")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+    report = run(args.only or list(SCENARIOS), args.iterations, args.alloc_iterations, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if baseline:
+        regressions = compare(report, baseline, args.threshold)
+        for name, metric, before, after in regressions:
+            print(f"❌ {name}: {metric} {before} -> {after}")
+        if regressions:
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:.0%}")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark typo-tolerant keyword matching
+Checks that exactly matching messages cost the same with correction on,
+that real words are never "corrected" into a keyword, times misspelled
+messages, and shows that a SpellingIndex lookup does not grow with the
+vocabulary the way a linear edit-distance scan does. Exits with code 1
+if the exact-match path got slower than --threshold.
+"""
+
+import argparse
+import random
+import string
+import sys
+import timeit
+
+import chatbot
+from chatbot import respond, spelling_index
+from enhanced_bot import EnhancedFitnessBot, UserProfile
+from fuzzy import SpellingIndex, edit_distance
+
+EXACT_INPUTS = [
+    "Give me a workout",
+    "budget dinner ideas",
+    "I'm stressed",
+    "how much water should I drink",
+    "hello",
+    "how much sleep do I need",
+    "thanks for the tips",
+]
+MISSPELLED_INPUTS = [
+    ("give me a workuot", "workout"),
+    ("breakfst ideas?", "breakfast_ideas"),
+    ("I feel stresed", "mood"),
+    ("protien intake", "macros"),
+    ("cardoi or streching?", "cardio_workout"),
+    ("excercise routine", "workout"),
+]
+# Real words next to a keyword, and the intent they must not be corrected into
+REAL_WORD_INPUTS = [
+    ("It's raining outside", "workout"),
+    ("what a draining day", "workout"),
+    ("I'm testing the app", "recovery"),
+    ("you're a winner", "dinner_ideas"),
+    ("product launch tomorrow", "lunch_ideas"),
+    ("I was thinking about it", "hydration"),
+]
+
+
+def best_per_call(func, inputs, number, repeat):
+    """Lowest µs per message over `repeat` rounds"""
+    return min(timeit.repeat(lambda: [func(text) for text in inputs], number=number, repeat=repeat)) \
+        / (number * len(inputs)) * 1e6
+
+
+def exact_path_times(turn, number, repeat):
+    """Best µs per exact message with correction (off, on), measured in
+    alternating rounds so machine noise hits both settings alike"""
+    off, on = [], []
+    for _ in range(repeat):
+        for enabled, times in ((False, off), (True, on)):
+            chatbot.TYPO_CORRECTION = enabled
+            times.append(best_per_call(turn, EXACT_INPUTS, number, 1))
+    chatbot.TYPO_CORRECTION = True
+    return min(off), min(on)
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """One random insertion, deletion, substitution or swap"""
+    i = rng.randrange(len(word) - 1)
+    edit = rng.randrange(4)
+    if edit == 0:
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    if edit == 1:
+        return word[:i] + word[i + 1:]
+    if edit == 2:
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def linear_correct(words, token):
+    limit = SpellingIndex.bound(token)
+    best = min(words, key=lambda word: edit_distance(token, word, limit))
+    return best if edit_distance(token, best, limit) <= limit else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Typo-tolerant matching benchmark")
+    parser.add_argument("--number", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown of the exact-match path")
+    args = parser.parse_args()
+
+    bot, profile = EnhancedFitnessBot(memory_size=1, seed=1), UserProfile()
+    turn = lambda text: respond(text, bot, profile, remember=False)
+    for text, intent in MISSPELLED_INPUTS:
+        assert turn(text)[1] == intent, f"{text!r} was not corrected to {intent}"
+    # Correction alone, without the intent classifier's guesses
+    chatbot.INTENT_CLASSIFIER = False
+    for text, intent in REAL_WORD_INPUTS:
+        assert turn(text)[1] != intent, f"{text!r} was corrected to {intent}"
+    chatbot.INTENT_CLASSIFIER = True
+
+    print("Exact matches (full turn):")
+    exact_off, exact_on = exact_path_times(turn, args.number, args.repeat)
+    slowdown = exact_on / exact_off - 1
+    print(f"  correction off : {exact_off:8.1f} µs/msg")
+    print(f"  correction on  : {exact_on:8.1f} µs/msg  ({slowdown:+.1%})\n")
+
+    index = spelling_index(bot.catalog)
+    misspelled = [text for text, _ in MISSPELLED_INPUTS]
+    cold = best_per_call(lambda text: (index._cache.clear(), turn(text)), misspelled, args.number // 10 or 1,
+                         args.repeat)
+    warm = best_per_call(turn, misspelled, args.number, args.repeat)
+    print("Misspelled messages (full turn):")
+    print(f"  uncached       : {cold:8.1f} µs/msg")
+    print(f"  cached tokens  : {warm:8.1f} µs/msg\n")
+
+    print("Correcting one token vs vocabulary size:")
+    print(f"  {'words':>8} {'index µs':>10} {'linear µs':>10}")
+    rng = random.Random(42)
+    for size in (len(index.words), 1_000, 4_000, 16_000):
+        words = list(index.words) + ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 12)))
+                                     for _ in range(size - len(index.words))]
+        sized = SpellingIndex(words, cache_size=0)
+        long_words = [word for word in words if len(word) >= 7]
+        queries = [misspell(word, rng) for word in rng.sample(long_words, min(200, len(long_words)))]
+        lookup = best_per_call(sized.correct, queries, 1, 3)
+        linear = best_per_call(lambda token: linear_correct(words, token), queries[:max(5, 20_000 // size)], 1, 1)
+        print(f"  {len(words):>8} {lookup:>10.1f} {linear:>10.1f}")
+
+    if slowdown > args.threshold:
+        print(f"❌ Exact-match path is {slowdown:.1%} slower with correction on")
+        sys.exit(1)
+    print("✅ Exact-match path unaffected")
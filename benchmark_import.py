@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the chatbot core
+Runs `python -X importtime` in fresh interpreters and fails (exit code 1)
+when importing the engine gets slower than the budget or pulls in Streamlit
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+CORE_MODULES = ["chatbot", "enhanced_bot", "sessions"]
+# Heavy UI/data libraries that must stay off the core import path
+FORBIDDEN_MODULES = ["streamlit", "numpy", "pandas"]
+
+
+def measure_once(modules):
+    """Return (total cumulative µs, set of imported top-level packages)"""
+    code = "import " + ", ".join(modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    )
+    total = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, raw_name = line[len("import time:"):].split("|")
+        cumulative, name = cumulative.strip(), raw_name.strip()
+        if not cumulative.isdigit():
+            continue  # header line
+        imported.add(name.split(".")[0])
+        # Nested imports are indented; only count the modules we asked for
+        if name in modules and raw_name == " " + name:
+            total += int(cumulative)
+    return total, imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="maximum cold import time of the core modules")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="fresh interpreters to start; the fastest run counts")
+    args = parser.parse_args()
+
+    runs = [measure_once(CORE_MODULES) for _ in range(args.runs)]
+    best_us = min(total for total, _ in runs)
+    imported = runs[0][1]
+
+    print(f"Core import ({', '.join(CORE_MODULES)}): {best_us / 1000:.1f} ms "
+          f"(budget {args.budget_ms:.0f} ms, best of {args.runs})")
+
+    failures = []
+    if best_us / 1000 > args.budget_ms:
+        failures.append(f"import time {best_us / 1000:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+    for module in FORBIDDEN_MODULES:
+        if module in imported:
+            failures.append(f"'{module}' is imported by the core")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Within budget")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled IntentMatcher against the original regex loop
+Run this after changing chatbot_rules or intent_matcher.py
+"""
+
+import random
+import re
+import timeit
+
+from chatbot import chatbot_rules, clean_input
+from intent_matcher import IntentMatcher
+
+
+def loop_match(cleaned_input):
+    """The original rule loop from get_chatbot_response"""
+    for pattern, rule_data in chatbot_rules.items():
+        if pattern == "default":
+            continue
+        if re.search(pattern, cleaned_input):
+            return rule_data
+    return None
+
+
+def build_inputs():
+    rng = random.Random(42)
+    filler = ("today i walked to the store and then i thought about what to cook "
+              "for the family because everyone was hungry after school ").split()
+    short_inputs = [
+        "hi there",
+        "Give me a workout plan",
+        "healthy breakfast ideas?",
+        "how much sleep do I need",
+        "I can't sleep at night",
+        "what is the weather like",
+    ]
+    long_inputs = []
+    for size in (1_000, 3_000):
+        words = []
+        while sum(len(w) + 1 for w in words) < size:
+            words.append(rng.choice(filler))
+        no_match = " ".join(words)
+        long_inputs.append(no_match)
+        long_inputs.append(no_match + " any dinner ideas")
+    return short_inputs, long_inputs
+
+
+def bench(label, inputs, matcher, number):
+    cleaned = [clean_input(text) for text in inputs]
+    for text in cleaned:
+        assert matcher.match(text) is loop_match(text), f"Mismatch for {text[:60]!r}"
+
+    loop_time = timeit.timeit(lambda: [loop_match(t) for t in cleaned], number=number)
+    matcher_time = timeit.timeit(lambda: [matcher.match(t) for t in cleaned], number=number)
+    per_call = number * len(cleaned)
+    print(f"{label}: {len(cleaned)} inputs, avg {sum(map(len, cleaned)) // len(cleaned)} chars")
+    print(f"  regex loop : {loop_time / per_call * 1e6:9.1f} µs/call")
+    print(f"  matcher    : {matcher_time / per_call * 1e6:9.1f} µs/call")
+    print(f"  speedup    : {loop_time / matcher_time:9.1f}x\n")
+
+
+if __name__ == "__main__":
+    matcher = IntentMatcher(chatbot_rules)
+    short_inputs, long_inputs = build_inputs()
+    bench("Short messages", short_inputs, matcher, number=2000)
+    # The regex loop is quadratic in input length, so one round is plenty
+    bench("Multi-kilobyte messages", long_inputs, matcher, number=1)
@@ -0,0 +1,425 @@
+"""
+Streamlit-free chatbot core: the legacy rule table plus the combined
+enhanced/rule-based response pipeline. Safe to import from workers and
+CLI tools; the Streamlit UI lives in bot.py.
+"""
+
+import dataclasses
+import logging
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from content import Catalog
+from enhanced_bot import EnhancedFitnessBot, MessageAnalysis, UserProfile, intent_router
+from fuzzy import SpellingIndex, load_words
+from intent_classifier import get_intent_classifier
+from intent_matcher import IntentMatcher
+from dialogue import DialogueState
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Chatbot Rules Definition for a Fitness App ---
+chatbot_rules = {
+    # Greetings
+    r".*\b(hi|hello|hey|greetings)\b.*": {
+        'response': "Hello there! 👋 Welcome to your fitness companion. How can I help you today?",
+        'intent': 'greeting'
+    },
+    r".*\b(how are you|how's it going)\b.*": {
+        'response': "I'm a bot 🤖 here to help with your fitness journey! How are you feeling today?",
+        'intent': 'greeting'
+    },
+    r".*\b(what is your name|who are you)\b.*": {
+        'response': "I'm your friendly **Fitness Bot** 💪 Ask me about workouts, meals, or sleep!",
+        'intent': 'greeting'
+    },
+
+    # Workout-related
+    r".*\b(workout plan|exercise routine|gym plan|workout|exercise|gym)\b.*": {
+        'response': "I can help with workout plans! 🏋️ Are you looking for beginners, strength, cardio, or flexibility?",
+        'intent': 'workout_plan'
+    },
+    r".*\b(beginner|start exercising)\b.*": {
+        'response': "For beginners, start with squats, push-ups, and planks. 🔥 Consistency is key!",
+        'intent': 'beginner_workout'
+    },
+    r".*\b(strength|strength training|build muscle)\b.*": {
+        'response': "Strength training tip: focus on squats, deadlifts, bench press, and overhead press. 🏋️",
+        'intent': 'strength_workout'
+    },
+    r".*\b(cardio|endurance)\b.*": {
+        'response': "Cardio keeps your heart strong ❤️ Try running, cycling, or swimming!",
+        'intent': 'cardio_workout'
+    },
+    r".*\b(flexibility|stretching|yoga)\b.*": {
+        'response': "Flexibility training 🧘 helps recovery. Try yoga or daily stretching for 10–15 mins.",
+        'intent': 'flexibility'
+    },
+    r".*\b(warm up|cool down|warmup|cooldown)\b.*": {
+        'response': "Always warm up for 5–10 mins before and cool down after workouts to avoid injuries. ✅",
+        'intent': 'workout_prep'
+    },
+    r".*\b(how many times a week|workout frequency|frequency)\b.*": {
+        'response': "Aim for 3–5 workout sessions per week 💡 and give your body time to rest.",
+        'intent': 'workout_frequency'
+    },
+
+    # Nutrition
+    r".*\b(healthy meals|diet plan|nutrition advice|meals|diet|nutrition)\b.*": {
+        'response': "Nutrition is key! 🥗 Want ideas for breakfast, lunch, dinner, or snacks?",
+        'intent': 'nutrition_plan'
+    },
+    r".*\b(breakfast ideas|healthy breakfast|breakfast)\b.*": {
+        'response': "Try oatmeal with fruits, Greek yogurt with berries, or eggs with veggies. 🍳",
+        'intent': 'breakfast_ideas'
+    },
+    r".*\b(lunch ideas|healthy lunch|lunch)\b.*": {
+        'response': "Healthy lunch 🥗: grilled chicken with veggies, quinoa salad, or lentils with rice.",
+        'intent': 'lunch_ideas'
+    },
+    r".*\b(dinner ideas|healthy dinner|dinner)\b.*": {
+        'response': "For dinner 🍽️: salmon with sweet potatoes, veggie stir-fry, or whole-grain pasta.",
+        'intent': 'dinner_ideas'
+    },
+    r".*\b(snack ideas|healthy snack|snacks)\b.*": {
+        'response': "Snack smart! 🍏 Nuts, fruit, hummus with carrots, or yogurt with seeds.",
+        'intent': 'snack_ideas'
+    },
+    r".*\b(meal prep|prepare food|mealprep)\b.*": {
+        'response': "Meal prep tip: cook proteins, carbs, and veggies in bulk on weekends. 🍱",
+        'intent': 'meal_prep'
+    },
+    r".*\b(calorie intake|how many calories|kg|kilogram|kgs|weight)\b.*": {
+        'response': "Calorie needs vary. ⚖️ Best to consult a professional, but I can share general nutrition principles.",
+        'intent': 'weight_calories'
+    },
+    r".*\b(protein|carbs|fats)\b.*": {
+        'response': "Balanced meals: protein for repair, carbs for energy, fats for health. 🥩🍞🥑",
+        'intent': 'macros'
+    },
+
+    # Sleep
+    r".*\b(improve sleep|sleep better|sleep tips|sleep)\b.*": {
+        'response': "Sleep well 😴 Keep a routine, reduce screens before bed, and rest 7–9 hrs.",
+        'intent': 'sleep_tips'
+    },
+    r".*\b(how much sleep|hours of sleep)\b.*": {
+        'response': "Most adults need 7–9 hours of good sleep per night. 🌙",
+        'intent': 'sleep_duration'
+    },
+    r".*\b(insomnia|can't sleep)\b.*": {
+        'response': "Try relaxation, avoid caffeine, and make your room sleep-friendly. 🛏️",
+        'intent': 'insomnia_help'
+    },
+
+    # Motivation & Features
+    r".*\b(track progress|monitor goals|track|progress|goals)\b.*": {
+        'response': "📊 You can track workouts, meals, and sleep progress inside the app.",
+        'intent': 'app_features'
+    },
+    r".*\b(app features|what can this app do|features)\b.*": {
+        'response': "This app offers workout plans, meal tracking, sleep logs, and goal setting. 🚀",
+        'intent': 'app_features'
+    },
+    r".*\b(motivation|stay motivated)\b.*": {
+        'response': "💡 Motivation tip: set small goals, find a buddy, and celebrate wins!",
+        'intent': 'motivation'
+    },
+
+    # Help
+    r".*\b(help)\b.*": {
+        'response': ("You can ask me about workouts, meals, sleep, and motivation. 🤖\n"
+                     "Try typing: 'workout plan', 'healthy meals', 'sleep tips', or 'motivate me'."),
+        'intent': 'help'
+    },
+
+
+    # Polite Closings
+    r".*\b(thank you|thanks)\b.*": {
+        'response': "You're welcome! 🙌 Keep pushing towards your goals!",
+        'intent': 'thank_you'
+    },
+    r".*\b(bye|goodbye|exit|quit|see you)\b.*": {
+        'response': "Goodbye 👋 Stay fit and healthy!",
+        'intent': 'exit'
+    },
+
+    # Default
+    "default": {
+        'response': "🤔 I'm not sure about that. Type 'help' to see what I can do!",
+        'intent': 'unknown'
+    }
+}
+
+# Built once at import so each message is scanned a single time
+rule_matcher = IntentMatcher(chatbot_rules)
+
+# Messages that match nothing exactly are retried with misspelled
+# keywords corrected; set to False for exact matching only
+TYPO_CORRECTION = True
+# Messages still unmatched are scored by the n-gram intent classifier
+# (see intent_classifier.py) before getting the default reply; it does
+# nothing if no trained model is present
+INTENT_CLASSIFIER = True
+_spelling: Optional[Tuple[Catalog, SpellingIndex]] = None
+
+
+def clean_input(user_input):
+    user_input = user_input.lower()
+    user_input = re.sub(r'[^\w\s]', '', user_input)
+    return user_input
+
+
+@lru_cache(maxsize=4096)
+def match_rule(cleaned_input):
+    """Rule lookup for a cleaned message; cached since it only depends on the text"""
+    return rule_matcher.match(cleaned_input)
+
+
+def classify_rule(cleaned_input, dialogue: DialogueState) -> Optional[Tuple[str, str]]:
+    """Legacy follow-up or rule for a cleaned message as (response, intent).
+
+    Returns None when no legacy rule applies. Doesn't touch the dialogue
+    state; the caller advances it only if this answer is used.
+    """
+    # Context handling (follow-ups of the session's last intent)
+    follow_up = dialogue.follow_up(cleaned_input)
+    if follow_up is not None:
+        return follow_up
+
+    # General rule matching
+    rule_data = match_rule(cleaned_input)
+    if rule_data is None:
+        return None
+    return rule_data['response'], rule_data['intent']
+
+
+def spelling_index(catalog: Catalog) -> SpellingIndex:
+    """Index over every rule, route and context keyword; rebuilt when the content changes.
+
+    Common English words are left alone, so "raining" never becomes "training".
+    """
+    global _spelling
+    if _spelling is None or _spelling[0] is not catalog:
+        words = rule_matcher.vocabulary() | intent_router.vocabulary() | catalog.context_index.vocabulary()
+        _spelling = (catalog, SpellingIndex(words, real_words=load_words()))
+    return _spelling[1]
+
+
+def get_rule_response(cleaned_input, dialogue: DialogueState):
+    """Original rule-based logic; returns (response, intent)"""
+    response, intent = classify_rule(cleaned_input, dialogue) or (
+        chatbot_rules["default"]['response'], chatbot_rules["default"]['intent'])
+    dialogue.advance(intent)
+    return response, intent
+
+
+def respond(user_input, bot: EnhancedFitnessBot, profile: UserProfile,
+            on_error: Optional[Callable[[Exception], None]] = None,
+            analysis: Optional[MessageAnalysis] = None, remember: bool = True,
+            dialogue: Optional[DialogueState] = None) -> Tuple[str, str]:
+    """Answer one message; returns (response, matched intent).
+
+    The message is classified once: an enhanced route wins, then a legacy
+    follow-up or rule. Unmatched messages are retried with typos corrected
+    and then given to the intent classifier; if that is unsure too, the
+    enhanced bot's general help reply answers. Only
+    the responder that answers updates the profile and conversation
+    memory. The session's dialogue state (bot.dialogue unless given)
+    moves to the answered intent.
+
+    The whole turn runs under the profile's lock, so sessions can be
+    served concurrently from a thread pool.
+    """
+    if dialogue is None:
+        dialogue = bot.dialogue
+    with profile.lock:
+        if not metrics.enabled:
+            response, intent = _respond(user_input, bot, profile, on_error, analysis, remember, dialogue)
+        else:
+            metrics.inc("chatbot_turns_total")
+            start = metrics.start()
+            try:
+                response, intent = _respond(user_input, bot, profile, on_error, analysis, remember,
+                                            dialogue)
+            finally:
+                metrics.observe("turn", start)
+        dialogue.advance(intent)
+    return response, intent
+
+
+def _respond(user_input, bot, profile, on_error, analysis, remember, dialogue):
+    try:
+        if analysis is None:
+            # Context is only extracted if the enhanced bot ends up answering
+            analysis = bot.analyze(user_input, with_context=False)
+        if analysis.route is None:
+            start = metrics.start()
+            rule = classify_rule(clean_input(user_input), dialogue)
+            metrics.observe("fallback_match", start)
+            if rule is None and TYPO_CORRECTION:
+                prediction = analysis.prediction
+                analysis, rule = _correct_typos(analysis, bot, dialogue)
+                if prediction is not None:
+                    analysis = dataclasses.replace(analysis, prediction=prediction)
+            matched_by = analysis.matched_by
+            if rule is None and analysis.route is None and INTENT_CLASSIFIER:
+                analysis, rule = _classify_intent(user_input, analysis)
+                matched_by = "classifier"
+            if rule is not None:
+                metrics.inc("chatbot_fallback_total", "reason", "rules")
+                if remember:
+                    bot.remember(user_input, rule[0], None, rule[1], matched_by)
+                return rule
+        response = bot.respond(user_input, profile, analysis, remember)
+        return response, analysis.route.name if analysis.route else "fallback"
+    except Exception as e:
+        logger.exception("Enhanced response failed")
+        metrics.inc("chatbot_fallback_total", "reason", "error")
+        if on_error is not None:
+            on_error(e)
+
+    # Original logic when the enhanced engine is unavailable
+    return get_rule_response(clean_input(user_input), dialogue)
+
+
+def _correct_typos(analysis: MessageAnalysis, bot: EnhancedFitnessBot, dialogue: DialogueState):
+    """Nothing matched exactly: fix misspelled keywords and classify again.
+
+    Returns the (possibly corrected) analysis and the legacy rule answer,
+    if the corrected text matches a rule but no route. A corrected match
+    is marked matched_by="typo", so it can't change saved data (see
+    Route.guess_handler).
+    """
+    start = metrics.start()
+    corrected = spelling_index(bot.catalog).correct_tokens(analysis.tokens)
+    rule = None
+    if corrected is not None:
+        text = " ".join(corrected)
+        analysis = bot.analyze(text, with_context=False)
+        if analysis.route is None:
+            rule = classify_rule(clean_input(text), dialogue)
+        if analysis.route is not None or rule is not None:
+            analysis = dataclasses.replace(analysis, matched_by="typo")
+        metrics.inc("chatbot_typo_corrections_total")
+    metrics.observe("typo_correction", start)
+    return analysis, rule
+
+
+def _classify_intent(user_input: str, analysis: MessageAnalysis):
+    """Last try before the default reply: the trained classifier's guess.
+
+    Returns the analysis with the predicted route and keyword, or the
+    predicted legacy rule's answer. Labels the current content no longer
+    has, low-confidence guesses and the fallback class change nothing.
+    Uses analysis.prediction when respond_batch() scored it already.
+    """
+    classifier = get_intent_classifier()
+    if classifier is None:
+        return analysis, None
+    start = metrics.start()
+    label, _ = analysis.prediction or classifier.predict(user_input)
+    rule = None
+    if label is not None:
+        kind, _, name = label.partition(":")
+        if kind == "route":
+            route_name, _, keyword = name.partition(":")
+            route = next((route for route in intent_router.routes if route.name == route_name), None)
+            if route is None:
+                label = None
+            else:
+                analysis = dataclasses.replace(analysis, route=route, keyword=keyword, matched_by="classifier")
+        else:
+            rule_data = next((rule_data for _, rule_data in rule_matcher.rules if rule_data['intent'] == name),
+                             None)
+            if rule_data is None:
+                label = None
+            else:
+                rule = rule_data['response'], rule_data['intent']
+    metrics.inc("chatbot_classifier_total", "result", "answered" if label else "unsure")
+    metrics.observe("intent_classifier", start)
+    return analysis, rule
+
+
+def get_chatbot_response(user_input, bot: EnhancedFitnessBot, profile: UserProfile,
+                         on_error: Optional[Callable[[Exception], None]] = None):
+    return respond(user_input, bot, profile, on_error)[0]
+
+
+def respond_batch(messages: List[str], profiles: List[UserProfile],
+                  bot: Optional[EnhancedFitnessBot] = None) -> Tuple[List[str], List[str]]:
+    """Answer a whole list of messages in one call, e.g. to replay logged traffic.
+
+    profiles[i] is the profile messages[i] belongs to (repeat the same
+    object for messages from one user). Tokenizing, context extraction,
+    routing and rule matching depend only on the text, so each distinct
+    message is analysed once per batch, and the ones nothing matches are
+    scored by the intent classifier in a single matrix product. Turns are not added to the bot's
+    conversation memory; each profile gets its own dialogue state.
+    Returns (responses, intents).
+    """
+    if len(messages) != len(profiles):
+        raise ValueError("messages and profiles must have the same length")
+    if bot is None:
+        bot = EnhancedFitnessBot(memory_size=1)
+
+    analyses: Dict[str, MessageAnalysis] = {}
+    for message in messages:
+        if message not in analyses:
+            analyses[message] = bot.analyze(message)
+    _predict_unmatched(analyses, bot)
+    dialogues: Dict[int, DialogueState] = {}
+    responses, intents = [], []
+    for message, profile in zip(messages, profiles):
+        analysis = analyses[message]
+        dialogue = dialogues.get(id(profile))
+        if dialogue is None:
+            dialogue = dialogues[id(profile)] = DialogueState()
+        response, intent = respond(message, bot, profile, analysis=analysis, remember=False,
+                                   dialogue=dialogue)
+        responses.append(response)
+        intents.append(intent)
+    return responses, intents
+
+
+def _predict_unmatched(analyses: Dict[str, MessageAnalysis], bot: EnhancedFitnessBot):
+    """Score every message no keyword, rule or typo correction matches with one
+    IntentClassifier.predict_batch() call, storing the result on its analysis"""
+    classifier = get_intent_classifier() if INTENT_CLASSIFIER else None
+    if classifier is None:
+        return
+    unmatched = [message for message, analysis in analyses.items()
+                 if analysis.route is None and match_rule(clean_input(message)) is None
+                 and not _corrects_to_match(analysis, bot)]
+    if not unmatched:
+        return
+    start = metrics.start()
+    for message, prediction in zip(unmatched, classifier.predict_batch(unmatched)):
+        analyses[message] = dataclasses.replace(analyses[message], prediction=prediction)
+    metrics.observe("intent_classifier_batch", start)
+
+
+def _corrects_to_match(analysis: MessageAnalysis, bot: EnhancedFitnessBot) -> bool:
+    if not TYPO_CORRECTION:
+        return False
+    corrected = spelling_index(bot.catalog).correct_tokens(analysis.tokens)
+    if corrected is None:
+        return False
+    text = " ".join(corrected)
+    return bot.analyze(text, with_context=False).route is not None or match_rule(clean_input(text)) is not None
+
+
+if __name__ == "__main__":
+    # Simple console chat, e.g. `python chatbot.py`
+    console_bot, console_profile = EnhancedFitnessBot(), UserProfile()
+    print("💪 Fitness Bot ready! Type 'bye' to exit.")
+    while True:
+        try:
+            user_input = input("You: ")
+        except EOFError:
+            break
+        print("Bot:", get_chatbot_response(user_input, console_bot, console_profile))
+        if clean_input(user_input).strip() in ("bye", "goodbye", "exit", "quit"):
+            break
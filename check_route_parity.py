@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Check that keyword routing still catches what the old substring tests did
+The enhanced bot used to pick a handler with `word in message.lower()`
+tests in a fixed order; IntentRouter matches whole tokens, plurals and
+inflections (see ROUTE_SUFFIXES) instead. This runs both over every
+route keyword, inflected forms and known substring false positives, and
+exits with code 1 on any disagreement not listed in INTENDED_DIFFERENCES.
+"""
+
+import sys
+from typing import Optional
+
+from enhanced_bot import intent_router
+from lexer import tokenize
+
+# The if/elif chain the router replaced, in its original order
+LEGACY_ROUTES = [
+    ("workout", ["workout", "exercise", "gym", "training"]),
+    ("meal", ["meal", "food", "eat", "nutrition", "diet"]),
+    ("goal", ["goal", "target", "achieve", "want to"]),
+    ("challenge", ["challenge", "motivate", "motivation"]),
+    ("hydration", ["water", "hydration", "drink"]),
+    ("mood", ["tired", "stressed", "sad", "anxious", "angry", "excited"]),
+    ("recovery", ["recovery", "rest", "sore", "tired muscles"]),
+    ("reminder", ["reminder"]),
+]
+# Word forms the substring tests caught inside longer words
+INFLECTED_FORMS = [
+    "workouts", "exercised", "gymnastics", "meals", "foods", "eating", "eaten", "nutritional",
+    "dieting", "dietary", "goals", "targets", "targeted", "achieved", "achievement", "challenges",
+    "challenged", "motivated", "motivational", "hydration", "drinks", "drinking", "tiredness",
+    "sadness", "resting", "rested", "soreness", "reminders",
+]
+# Messages the substring tests routed by accident or missed -> the route they get now
+INTENDED_DIFFERENCES = {
+    "I'm exercising today": "workout",
+    "achieving my plan": "goal",
+    "a challenging week": "challenge",
+    "I need motivating": "challenge",
+    "I'm hydrating": "hydration",
+    "I'm interested in yoga": None,
+    "that's great": None,
+    "the weather is nice": None,
+    "a walk in the forest": None,
+    "theatre tickets": None,
+    "I'm wearing a sweater": None,
+    "which restaurant is open": None,
+    "watering the plants": None,
+    "the water is watered down": "hydration",
+}
+
+
+def legacy_route(message: str) -> Optional[str]:
+    lowered = message.lower()
+    for name, words in LEGACY_ROUTES:
+        if any(word in lowered for word in words):
+            return name
+    return None
+
+
+def route(message: str) -> Optional[str]:
+    matched = intent_router.route(tokenize(message))
+    return matched[0].name if matched else None
+
+
+def messages():
+    keywords = [word for _, words in LEGACY_ROUTES for word in words]
+    for word in keywords + INFLECTED_FORMS:
+        yield word
+        yield f"Tell me about {word.upper()} please!"
+        yield f"I'm {word} today"
+
+
+if __name__ == "__main__":
+    problems = []
+    for message in messages():
+        expected, actual = legacy_route(message), route(message)
+        if actual != expected:
+            problems.append(f"{message!r}: substring tests -> {expected}, router -> {actual}")
+    for message, intended in INTENDED_DIFFERENCES.items():
+        actual = route(message)
+        if actual != intended:
+            problems.append(f"{message!r}: router -> {actual}, intended {intended}")
+
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        sys.exit(1)
+    print(f"✅ Router agrees with the substring tests on {sum(1 for _ in messages())} messages")
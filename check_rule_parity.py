@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Check that index.html answers exactly like the Python rule engine
+Runs the same conversations through chatbot.get_rule_response() and
+through rule_matcher.js (under Node, over rules.json) and compares every
+(response, intent). Also compares clean_input() on every Unicode
+character Python knows, and that rules.json is up to date. Exits with
+code 1 on any difference.
+"""
+
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import sys
+import unicodedata
+from typing import List, Tuple
+
+from chatbot import clean_input, get_rule_response, rule_matcher
+from dialogue import TRANSITIONS, DialogueState
+from export_rules import RULES_PATH, compile_rules, render
+from intent_matcher import _RULE_PATTERN
+
+# Reads {"rules": path, "conversations": [[message, ...], ...], "text": str}
+# and prints [[[response, intent], ...], ...] and the cleaned text
+NODE_DRIVER = """
+const fs = require('fs');
+const { RuleMatcher, cleanInput } = require(process.argv[1]);
+const job = JSON.parse(fs.readFileSync(0, 'utf8'));
+const matcher = new RuleMatcher(JSON.parse(fs.readFileSync(job.rules, 'utf8')));
+const answers = job.conversations.map(messages => {
+    matcher.reset();
+    return messages.map(message => {
+        const answer = matcher.respond(message);
+        return [answer.response, answer.intent];
+    });
+});
+process.stdout.write(JSON.stringify({ answers, cleaned: cleanInput(job.text) }));
+"""
+NOISE = ["please", "me", "a", "the", "my", "today", "now", "hiking", "breakfasts", "sleepy", "cant",
+         "wörkout", "Çardio", "İnsomnia", "ДИЕТА", "ｗｏｒｋｏｕｔ", "💪", "½", "x²", "_gym_", "3kg"]
+PUNCTUATION = ["", "!", "?", "...", ",", "'s", " :)", "-"]
+SEPARATORS = [" ", " ", " ", "  ", "\t", "\n", " ", "　"]
+
+
+def rule_phrases() -> List[str]:
+    return [phrase for pattern, _ in rule_matcher.rules for phrase in _RULE_PATTERN.match(pattern).group(1).split("|")]
+
+
+def conversations(count: int, seed: int) -> List[List[str]]:
+    """Every phrase alone and in context, follow-ups, then random mixes"""
+    rng = random.Random(seed)
+    phrases = rule_phrases()
+    triggers = [word for options in TRANSITIONS.values() for words, _, _ in options for word in words]
+    cases = [[phrase] for phrase in phrases]
+    cases += [[f"{phrase.upper()}{rng.choice(PUNCTUATION)}"] for phrase in phrases]
+    cases += [[phrase.replace(" ", separator)] for phrase in phrases if " " in phrase for separator in SEPARATORS]
+    cases += [[f"{first} and {second}"] for first in phrases[::3] for second in phrases[1::4]]
+    cases += [[opener, f"{trigger} please"] for opener in ("workout plan", "gym", "sleep", "hello")
+              for trigger in triggers + ["something else"]]
+    words = phrases + triggers + NOISE
+    for _ in range(count):
+        cases.append([rng.choice(SEPARATORS).join(rng.choice(words) + rng.choice(PUNCTUATION)
+                                                  for _ in range(rng.randint(1, 6)))
+                      for _ in range(rng.randint(1, 5))])
+    return cases
+
+
+def python_answers(cases: List[List[str]]) -> List[List[Tuple[str, str]]]:
+    answers = []
+    for messages in cases:
+        dialogue = DialogueState()
+        answers.append([get_rule_response(clean_input(message), dialogue) for message in messages])
+    return answers
+
+
+def known_characters() -> str:
+    """Every character of Python's Unicode database (Node's may be newer)"""
+    return "".join(chr(code) for code in range(sys.maxunicode + 1)
+                   if unicodedata.category(chr(code)) not in ("Cn", "Cs"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the Python and browser rule matchers")
+    parser.add_argument("--conversations", type=int, default=5000, help="random conversations to add")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with open(RULES_PATH, encoding="utf-8") as f:
+        if f.read() != render(compile_rules()):
+            print("❌ rules.json is out of date; run python export_rules.py")
+            sys.exit(1)
+    node = shutil.which("node")
+    if node is None:
+        print("❌ Node.js is needed to run rule_matcher.js")
+        sys.exit(1)
+
+    cases = conversations(args.conversations, args.seed)
+    text = known_characters()
+    job = json.dumps({"rules": RULES_PATH, "conversations": cases, "text": text}, ensure_ascii=False)
+    matcher_js = RULES_PATH.replace("rules.json", "rule_matcher.js")
+    result = json.loads(subprocess.run([node, "-e", NODE_DRIVER, matcher_js], input=job.encode("utf-8"),
+                                       capture_output=True, check=True).stdout)
+
+    mismatches = 0
+    for messages, expected, actual in zip(cases, python_answers(cases), result["answers"]):
+        if [list(answer) for answer in expected] != actual:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  {messages!r}\n    python: {[intent for _, intent in expected]}"
+                      f"\n    js:     {[intent for _, intent in actual]}")
+    cleaned_ok = result["cleaned"] == clean_input(text)
+    turns = sum(len(messages) for messages in cases)
+    print(f"{len(cases)} conversations, {turns} messages: {mismatches} differ")
+    print(f"clean_input over {len(text)} characters: {'same' if cleaned_ok else 'different'}")
+    if mismatches or not cleaned_ok:
+        print("❌ rule_matcher.js and chatbot.get_rule_response disagree")
+        sys.exit(1)
+    print("✅ Browser and Python rule matching agree")
@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+
+from lexer import KeywordIndex
+
+logger = logging.getLogger(__name__)
+
+CONTENT_PATH = os.environ.get(
+    "FITNESS_BOT_CONTENT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "content.json"))
+
+REQUIRED_SECTIONS = ["context_keywords", "equipment_keywords", "workout_exercises", "workout_variations",
+                     "seasonal_foods", "budget_meals", "smart_goals", "mood_activities",
+                     "weekly_challenges"]
+# Keys the handlers look up directly, each of which must hold a non-empty list
+REQUIRED_KEYS = {
+    "workout_exercises": ("low", "moderate", "high"),
+    "seasonal_foods": ("winter", "spring", "summer", "fall"),
+    "budget_meals": ("low", "medium", "high"),
+}
+MEAL_TYPES = ("breakfast", "lunch", "dinner")
+
+
+def validate(data: Mapping):
+    """Raise ValueError unless every section has what the handlers look up"""
+    missing = [section for section in REQUIRED_SECTIONS if section not in data]
+    if missing:
+        raise ValueError(f"Content is missing sections: {', '.join(missing)}")
+    problems = []
+    for section, keys in REQUIRED_KEYS.items():
+        for key in keys:
+            value = data[section].get(key) if isinstance(data[section], dict) else None
+            if not value:
+                problems.append(f"{section}[{key!r}] is missing or empty")
+    for budget in REQUIRED_KEYS["budget_meals"]:
+        meals = data["budget_meals"].get(budget)
+        if isinstance(meals, dict) and meals:
+            problems += [f"budget_meals[{budget!r}][{meal!r}] is missing or empty"
+                         for meal in MEAL_TYPES if not meals.get(meal)]
+    for exercise, variations in dict(data["workout_variations"]).items():
+        if not variations:
+            problems.append(f"workout_variations[{exercise!r}] is empty")
+    if not data["weekly_challenges"]:
+        problems.append("weekly_challenges is empty")
+    for group in data["context_keywords"]:
+        if not {"feature", "value", "keywords"} <= set(group):
+            problems.append(f"context keyword group {group!r} needs feature, value and keywords")
+        elif group["feature"] == "budget" and group["value"] not in data["budget_meals"]:
+            problems.append(f"budget keyword value {group['value']!r} has no budget_meals entry")
+    if problems:
+        raise ValueError("; ".join(problems))
+
+
+def freeze(value: Any) -> Any:
+    """Deep read-only copy: dicts become mappingproxies and lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """One immutable version of the bot's content, shared by every session"""
+    workout_exercises: Mapping[str, Tuple[str, ...]]
+    workout_variations: Mapping[str, Tuple[str, ...]]
+    seasonal_foods: Mapping[str, Tuple[str, ...]]
+    budget_meals: Mapping[str, Mapping[str, str]]
+    smart_goals: Tuple[Tuple[str, str], ...]  # checked in file order
+    mood_activities: Mapping[str, str]
+    weekly_challenges: Tuple[str, ...]
+    # Context keywords, indexed for a single scan of the message tokens
+    context_index: KeywordIndex
+    version: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Mapping, version: float = 0.0) -> 'Catalog':
+        validate(data)
+
+        # Within a feature the earliest group wins, except equipment where the
+        # last listed keyword wins. A value of None means "use the number in
+        # front of the keyword".
+        context_index = KeywordIndex()
+        for rank, group in enumerate(data["context_keywords"]):
+            for keyword in group["keywords"]:
+                context_index.add(keyword, (group["feature"], rank, group["value"]))
+        for rank, keyword in enumerate(data["equipment_keywords"]):
+            context_index.add(keyword, ("equipment", -rank, keyword))
+
+        return cls(
+            workout_exercises=freeze(data["workout_exercises"]),
+            workout_variations=freeze(data["workout_variations"]),
+            seasonal_foods=freeze(data["seasonal_foods"]),
+            budget_meals=freeze(data["budget_meals"]),
+            smart_goals=tuple(data["smart_goals"].items()),
+            mood_activities=freeze(data["mood_activities"]),
+            weekly_challenges=freeze(data["weekly_challenges"]),
+            context_index=context_index,
+            version=version,
+        )
+
+
+def load_catalog(path: str = CONTENT_PATH) -> Catalog:
+    # Stat first: an edit landing while the file is read then has a newer
+    # mtime than the catalog, so the next check loads it again
+    version = os.stat(path).st_mtime
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return Catalog.from_dict(data, version=version)
+
+
+class ContentStore:
+    """Holds the current Catalog and swaps in a new one when the file changes.
+
+    `current` stats the file at most once every `check_interval` seconds.
+    A changed file is parsed and indexed completely before the reference
+    is swapped, so readers always see either the old or the new catalog
+    in full. A file that fails to load is logged and the old catalog
+    stays in place. Each worker process checks its own copy, so edits
+    reach every worker without a restart.
+    """
+
+    def __init__(self, path: str = CONTENT_PATH, check_interval: float = 2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._catalog = load_catalog(path)
+        self._next_check = time.monotonic() + check_interval
+        self._failed_version = None
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Catalog:
+        if time.monotonic() >= self._next_check:
+            self.reload_if_changed()
+        return self._catalog
+
+    def reload_if_changed(self) -> bool:
+        # Only one thread checks; the others keep using the current catalog
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                version = os.stat(self.path).st_mtime
+            except OSError:
+                return False
+            if version in (self._catalog.version, self._failed_version):
+                return False
+            return self.reload()
+        finally:
+            self._lock.release()
+
+    def reload(self) -> bool:
+        """Load the file now; returns False (keeping the old content) if it's invalid"""
+        try:
+            catalog = load_catalog(self.path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error("Keeping previous content, %s failed to load: %s", self.path, e)
+            try:
+                self._failed_version = os.stat(self.path).st_mtime
+            except OSError:
+                pass
+            return False
+        self._catalog = catalog
+        self.reloads += 1
+        logger.info("Reloaded content from %s", self.path)
+        return True
+
+
+_content_store: Optional[ContentStore] = None
+
+
+def get_content_store() -> ContentStore:
+    """Process-wide ContentStore for CONTENT_PATH"""
+    global _content_store
+    if _content_store is None:
+        _content_store = ContentStore()
+    return _content_store
@@ -0,0 +1,61 @@
+import json
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from memory import ConversationMemory, Turn
+
+
+def turn_record(turn: Turn, session_id: Optional[str] = None) -> Dict:
+    """One JSONL record: Turn.to_dict() plus the session it belongs to"""
+    record = turn.to_dict()
+    record["session_id"] = session_id
+    return record
+
+
+class TurnExporter:
+    """Appends conversation turns to a JSONL file, one record per line.
+
+    Pass it to SessionManager as `turn_exporter`: every turn is written
+    once, either when it drops out of the session's memory (see attach())
+    or when the session expires or the manager closes. The file is only
+    ever appended to, so an analytics run (see analytics.py) can read it
+    while the bot is still serving. The records use the same format as
+    ConversationMemory spill files.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.exported = 0
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, session_id: Optional[str], memory: ConversationMemory) -> int:
+        """Write every turn in memory; returns how many were written"""
+        lines = [json.dumps(turn_record(turn, session_id), ensure_ascii=False) + "\n" for turn in memory]
+        with self._lock:
+            self._file.writelines(lines)
+            self._file.flush()
+            self.exported += len(lines)
+        return len(lines)
+
+    def write_turn(self, session_id: Optional[str], turn: Turn):
+        """Write one turn; buffered, so it reaches the file with the next flush"""
+        line = json.dumps(turn_record(turn, session_id), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.exported += 1
+
+    def attach(self, session_id: Optional[str], memory: ConversationMemory):
+        """Write turns the memory evicts as they go, so long sessions are exported in full"""
+        memory.on_spill = lambda turn: self.write_turn(session_id, turn)
+
+    def export_all(self, sessions: Iterable[Tuple[str, object]]) -> int:
+        """Write the turns of many (session_id, Session) pairs, e.g. SessionManager.items()"""
+        return sum(self.export(session_id, session.bot.conversation_memory) for session_id, session in sessions)
+
+    def __call__(self, session_id: str, session):
+        self.export(session_id, session.bot.conversation_memory)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -4,8 +4,8 @@ Demo script showcasing all 14 enhanced features of the fitness chatbot
 Run this to see all implemented features in action
 """
 
-from enhanced_bot import EnhancedFitnessBot, UserProfile
 import datetime
+from enhanced_bot import EnhancedFitnessBot, UserProfile
 
 def demo_all_features():
     print("🚀 ENHANCED FITNESS CHATBOT - FEATURE DEMO")
@@ -109,19 +109,14 @@ def demo_all_features():
     print("-" * 40)
     
     # Simulate conversation memory
-    bot.conversation_memory = [
-        {
-            'timestamp': datetime.datetime.now(),
-            'user': 'Give me a workout',
-            'bot': 'Here is a workout plan...',
-            'context': {'energy': 7}
-        }
-    ]
+    bot.conversation_memory.append('Give me a workout', 'Here is a workout plan...', {'energy': 7})
+    turn = bot.conversation_memory.last(1)[0]
     
     print("Previous conversation stored:")
-    print(f"User said: {bot.conversation_memory[0]['user']}")
-    print(f"Bot responded: {bot.conversation_memory[0]['bot']}")
-    print(f"Context remembered: {bot.conversation_memory[0]['context']}\n")
+    print(f"User said: {turn.user}")
+    print(f"Bot responded: {turn.bot}")
+    print(f"Context remembered: {turn.context}")
+    print(f"Memory capacity: {len(bot.conversation_memory)}/{bot.conversation_memory.capacity} turns\n")
     
     # Feature 8: Multi-modal Input Processing
     print("8️⃣ MULTI-MODAL INPUT PROCESSING")
@@ -180,10 +175,18 @@ def demo_all_features():
     print("1️⃣2️⃣ STREAK TRACKING & ACCOUNTABILITY")
     print("-" * 40)
     
-    # Simulate workout streak
+    # Simulate a week of daily workouts, then a year backfilled from a tracker
+    today = bot.now().date()
+    streak_bot = EnhancedFitnessBot(clock=lambda: day_time)
     for day in range(1, 8):
-        streak_msg = bot.track_streaks("workout", profile)
+        day_time = datetime.datetime.combine(today + datetime.timedelta(days=day - 7), datetime.time(9))
+        streak_msg = streak_bot.track_streaks("workout", profile)
         print(f"Day {day}: {streak_msg}")
+    workouts = profile.activity["workout"]
+    workouts.backfill(today - datetime.timedelta(days=back) for back in range(8, 365) if back % 4)
+    year, month, count = workouts.best_month()
+    print(f"Longest streak: {workouts.longest} days, best month: {year}-{month:02d} ({count} workout days)")
+    print(f"Last 4 weeks: {[count for _, count in workouts.weekly_counts(4, today)]}")
     
     print()
     
@@ -0,0 +1,47 @@
+from typing import Dict, List, Optional, Tuple
+
+WORKOUT_FOLLOW_UPS = [
+    (("beginner",), "Great! Start with squats, push-ups, and planks 💪.", 'beginner_workout'),
+    (("strength",), "Strength training = squats, deadlifts, and presses. 🏋️", 'strength_workout'),
+    (("cardio",), "Cardio = running, cycling, swimming. ❤️", 'cardio_workout'),
+]
+
+# intent -> [(trigger words, response, next intent)]; the first entry with a
+# trigger word in the cleaned message answers it. Both the legacy rule and
+# the enhanced route offer workout follow-ups.
+TRANSITIONS: Dict[str, List[Tuple[Tuple[str, ...], str, str]]] = {
+    'workout_plan': WORKOUT_FOLLOW_UPS,
+    'workout': WORKOUT_FOLLOW_UPS,
+}
+
+
+class DialogueState:
+    """Per-session position in the follow-up transition table.
+
+    Each session (one EnhancedFitnessBot) owns its own state, so users
+    never see each other's follow-ups. follow_up() only reads the state;
+    advance() moves it once a response has actually been sent. Turns of
+    one session are serialized by chatbot.respond, which holds the
+    profile's lock for the whole turn.
+    """
+
+    def __init__(self, transitions: Dict = TRANSITIONS):
+        self.transitions = transitions
+        self.intent: Optional[str] = None
+
+    def follow_up(self, cleaned_input: str) -> Optional[Tuple[str, str]]:
+        """(response, intent) if the message continues the current intent"""
+        options = self.transitions.get(self.intent)
+        if not options:
+            return None
+        words = set(cleaned_input.split())
+        for triggers, response, intent in options:
+            if words.intersection(triggers):
+                return response, intent
+        return None
+
+    def advance(self, intent: Optional[str]):
+        self.intent = intent
+
+    def reset(self):
+        self.advance(None)
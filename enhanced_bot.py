@@ -1,12 +1,26 @@
-import re
-import streamlit as st
+import copy
 import random
 import datetime
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+import threading
+from dataclasses import dataclass, field, fields, replace
+from typing import Callable, Dict, List, Optional, Tuple
+from activity_log import ActivityLog
+from content import Catalog, ContentStore, get_content_store
+from dialogue import DialogueState
+from intent_router import IntentRouter, Route
+from memory import ConversationMemory
+from metrics import metrics
+from mood_log import MoodLog
+from response_cache import ResponseCache
+from lexer import tokenize
+
+# Features extract_context reports, in output order; the keywords for
+# each live in the content catalog (content.json)
+CONTEXT_FEATURES = ["energy", "time", "budget", "equipment"]
 
 @dataclass
 class UserProfile:
+    user_id: Optional[str] = None
     energy_level: int = 5
     available_time: int = 30
     equipment: List[str] = field(default_factory=lambda: ["bodyweight"])
@@ -17,61 +31,234 @@ class UserProfile:
     preferred_exercises: List[str] = field(default_factory=list)
     budget_range: str = "medium"
     goals: List[str] = field(default_factory=list)
-    mood_history: List[Dict] = field(default_factory=list)
+    mood_history: MoodLog = field(default_factory=MoodLog)
+    # activity type ("workout", "nutrition") -> dated events; the streak
+    # fields above mirror these logs
+    activity: Dict[str, ActivityLog] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # Held for a whole turn by chatbot.respond and while the profile
+        # store snapshots it; not a field, so it's never saved or compared
+        self.lock = threading.RLock()
+        # Saved profiles store each log as a list of date ordinals
+        self.activity = {kind: log if isinstance(log, ActivityLog) else ActivityLog(log)
+                         for kind, log in self.activity.items()}
+        if "workout" not in self.activity and self.last_workout_date and self.workout_streak:
+            # Profiles from before the activity log: rebuild the current streak
+            last = datetime.datetime.strptime(self.last_workout_date, "%Y-%m-%d").date()
+            self.activity["workout"] = ActivityLog(
+                range(last.toordinal() - self.workout_streak + 1, last.toordinal() + 1))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def to_dict(self) -> Dict:
+        """JSON-friendly snapshot of the profile"""
+        data = {f.name: getattr(self, f.name) for f in fields(self) if f.name != "mood_history"}
+        data["mood_history"] = list(self.mood_history)
+        data["activity"] = self.activity_ordinals()
+        return data
+
+    def activity_ordinals(self) -> Dict[str, List[int]]:
+        return {kind: log.ordinals() for kind, log in self.activity.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'UserProfile':
+        known = {f.name for f in fields(cls)} - {"mood_history"}
+        profile = cls(**{k: copy.deepcopy(v) for k, v in data.items() if k in known})
+        for entry in data.get("mood_history", []):
+            date = datetime.datetime.strptime(entry["date"], "%Y-%m-%d").date()
+            profile.mood_history.log(date, entry["mood"], entry["activity_suggested"])
+        return profile
+
+@dataclass(frozen=True)
+class MessageAnalysis:
+    """Everything derived from the message text alone"""
+    tokens: List[str]
+    context: Optional[Dict]  # None until extracted, see EnhancedFitnessBot.analyze
+    route: Optional[Route]
+    keyword: Optional[str]
+    # Intent classifier output (label, confidence) if computed ahead, see chatbot.respond_batch
+    prediction: Optional[Tuple[Optional[str], float]] = None
+    # How a route or rule was found when the text didn't match exactly:
+    # "typo" (keywords corrected) or "classifier" (the intent classifier's guess)
+    matched_by: Optional[str] = None
 
 class EnhancedFitnessBot:
-    def __init__(self):
-        self.conversation_memory = []
-        self.workout_variations = {
-            "squats": ["jump squats", "sumo squats", "single-leg squats", "wall squats"],
-            "pushups": ["incline pushups", "diamond pushups", "wide-grip pushups", "knee pushups"],
-            "planks": ["side planks", "plank up-downs", "mountain climber planks", "reverse planks"]
-        }
-        self.seasonal_foods = {
-            "winter": ["soup", "stew", "roasted vegetables", "warm oatmeal"],
-            "spring": ["fresh salads", "asparagus", "strawberries", "light soups"],
-            "summer": ["cold gazpacho", "grilled vegetables", "fresh fruits", "smoothie bowls"],
-            "fall": ["pumpkin dishes", "apple recipes", "hearty grains", "warm spices"]
-        }
+    def __init__(self, memory_size: int = 50, memory_spill_path: Optional[str] = None,
+                 profile_store=None,
+                 clock: Callable[[], datetime.datetime] = datetime.datetime.now,
+                 seed: Optional[int] = None, content: Optional[ContentStore] = None):
+        # Only the most recent turns are kept in memory; older ones are
+        # spilled to memory_spill_path (if set) or dropped
+        self.conversation_memory = ConversationMemory(memory_size, memory_spill_path)
+        # Optional persistence.ProfileStore; profile changes are queued there
+        self.profile_store = profile_store
+        # Time and randomness are injectable so sessions can be replayed exactly
+        self.clock = clock
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self._now = None
+        # Exercises, meals, goals etc. come from the shared content catalog
+        self.content = content or get_content_store()
+        self._catalog = None
+        # Follow-up state of the legacy rules; a bot serves a single session
+        self.dialogue = DialogueState()
+
+    def export_state(self) -> Dict:
+        """Per-session state (remembered turns, dialogue position, randomness) as picklable data"""
+        return {"turns": list(self.conversation_memory), "dialogue": self.dialogue.intent,
+                "rng": self.rng.getstate()}
+
+    def import_state(self, state: Dict):
+        """Continue a session from export_state() of a bot elsewhere"""
+        for turn in state["turns"]:
+            self.conversation_memory.add(turn)
+        self.dialogue.advance(state["dialogue"])
+        self.rng.setstate(state["rng"])
+
+    def now(self) -> datetime.datetime:
+        """Current time; fixed for the duration of one respond() call"""
+        return self._now or self.clock()
+
+    @property
+    def catalog(self) -> Catalog:
+        """Content in use; one respond() call sees a single catalog version"""
+        return self._catalog or self.content.current
         
-    def extract_context(self, user_input: str) -> Dict:
-        """Extract context from user input"""
-        context = {}
+    def _profile_changed(self, profile: 'UserProfile'):
+        """Queue a changed profile for the next batched write"""
+        if self.profile_store is not None and profile.user_id is not None:
+            self.profile_store.save(profile)
+
+    def analyze(self, user_input: str, with_context: bool = True) -> 'MessageAnalysis':
+        """Tokenize, pick a route and extract context; depends only on the text.
+
+        With with_context=False the context is left as None and only
+        extracted by respond(), so callers that may answer some other way
+        don't pay for it.
+        """
+        if metrics.enabled:
+            return self._analyze_timed(user_input, with_context)
+        tokens = tokenize(user_input)
+        matched = intent_router.route(tokens)
+        route, keyword = matched if matched else (None, None)
+        context = self.extract_context(user_input, tokens) if with_context else None
+        return MessageAnalysis(tokens, context, route, keyword)
+
+    def _analyze_timed(self, user_input: str, with_context: bool) -> 'MessageAnalysis':
+        """analyze() with per-stage timings; kept separate so the untimed path pays nothing"""
+        start = metrics.start()
+        tokens = tokenize(user_input)
+        metrics.observe("normalize", start)
+        start = metrics.start()
+        matched = intent_router.route(tokens)
+        metrics.observe("route", start)
+        route, keyword = matched if matched else (None, None)
+        context = self._timed_context(user_input, tokens) if with_context else None
+        return MessageAnalysis(tokens, context, route, keyword)
+
+    def _timed_context(self, user_input: str, tokens: List[str]) -> Dict:
+        start = metrics.start()
+        context = self.extract_context(user_input, tokens)
+        metrics.observe("extract_context", start)
+        return context
+
+    def respond(self, user_input: str, profile: 'UserProfile',
+                analysis: Optional['MessageAnalysis'] = None, remember: bool = True) -> str:
+        """Generate the enhanced response for one message and remember the turn"""
+        if analysis is None:
+            analysis = self.analyze(user_input)
+        elif analysis.context is None:
+            analysis = replace(analysis, context=self._timed_context(user_input, analysis.tokens)
+                               if metrics.enabled else self.extract_context(user_input, analysis.tokens))
+        self._now = self.clock()
+        self._catalog = self.content.current
+        try:
+            return self._respond(user_input, profile, analysis, remember)
+        finally:
+            self._now = None
+            self._catalog = None
+
+    def _respond(self, user_input: str, profile: 'UserProfile', analysis: 'MessageAnalysis',
+                 remember: bool) -> str:
+        context = analysis.context
         
-        # Energy level detection
-        if any(word in user_input.lower() for word in ["tired", "exhausted", "drained", "😴"]):
-            context["energy"] = 3
-        elif any(word in user_input.lower() for word in ["energetic", "pumped", "motivated", "💪"]):
-            context["energy"] = 8
-        elif any(word in user_input.lower() for word in ["okay", "normal", "fine"]):
-            context["energy"] = 5
-            
-        # Time extraction
-        time_patterns = [r"(\d+)\s*min", r"quick", r"short", r"long", r"hour"]
-        for pattern in time_patterns:
-            if re.search(pattern, user_input.lower()):
-                if "quick" in user_input.lower() or "short" in user_input.lower():
-                    context["time"] = 10
-                elif "long" in user_input.lower() or "hour" in user_input.lower():
-                    context["time"] = 60
-                else:
-                    match = re.search(r"(\d+)", user_input)
-                    if match:
-                        context["time"] = int(match.group(1))
+        # Update profile with context; a guessed reading of the message never changes saved data
+        guessed = analysis.matched_by is not None
+        if not guessed:
+            if "energy" in context:
+                profile.energy_level = context["energy"]
+            if "time" in context:
+                profile.available_time = context["time"]
+            if "budget" in context:
+                profile.budget_range = context["budget"]
+            if context:
+                self._profile_changed(profile)
         
-        # Budget detection
-        if any(word in user_input.lower() for word in ["budget", "cheap", "affordable", "money"]):
-            context["budget"] = "low"
-        elif any(word in user_input.lower() for word in ["expensive", "premium", "high-end"]):
-            context["budget"] = "high"
-            
-        # Equipment detection
-        equipment_keywords = ["dumbbells", "resistance bands", "yoga mat", "no equipment", "bodyweight"]
-        for eq in equipment_keywords:
-            if eq in user_input.lower():
-                context["equipment"] = eq
-                
-        return context
+        # Generate the response for the routed intent
+        route = analysis.route
+        start = metrics.start()
+        if route is not None and guessed and route.guess_handler is not None:
+            response = route.guess_handler(self, user_input, context, profile, analysis.keyword)
+        elif route is not None and route.cache_on is not None:
+            now = self.now()
+            # The catalog version keeps answers from before a content reload out
+            key = (route.name, user_input.strip().lower(), self._catalog.version,
+                   tuple(CACHE_DEPENDENCIES[name](profile, now) for name in route.cache_on))
+            response = response_cache.get(key)
+            metrics.inc("chatbot_response_cache_total", "result", "miss" if response is None else "hit")
+            if response is None:
+                response = route.handler(self, user_input, context, profile, analysis.keyword)
+                response_cache.put(key, response)
+        elif route is not None:
+            response = route.handler(self, user_input, context, profile, analysis.keyword)
+        else:
+            # Nothing matched, not even the legacy rules in chatbot.respond
+            response = "I can help with personalized workouts, meal planning, goal setting, challenges, hydration, mood-based fitness, and recovery! What interests you? 🤖"
+        if start is not None:
+            metrics.observe("handler", start)
+            if route is not None:
+                metrics.inc("chatbot_route_total", "route", route.name)
+            else:
+                metrics.inc("chatbot_fallback_total", "reason", "no_route")
+        
+        # Remember conversation
+        if remember:
+            if route is not None and route.name == "mood":
+                context = dict(context, mood=analysis.keyword)
+            self.remember(user_input, response, context, route.name if route else "fallback", analysis.matched_by)
+        
+        return response
+
+    def remember(self, user_input: str, response: str, context: Optional[Dict], intent: str,
+                 matched_by: Optional[str] = None):
+        """Add a turn to the conversation memory, timestamped with the bot's clock"""
+        self.conversation_memory.append(user_input, response, context, self.now().timestamp(), intent,
+                                        matched_by)
+
+    def extract_context(self, user_input: str, tokens: Optional[List[str]] = None) -> Dict:
+        """Extract context from user input"""
+        if tokens is None:
+            tokens = tokenize(user_input)
+
+        best = {}
+        for position, (feature, rank, value) in self.catalog.context_index.scan(tokens):
+            if value is None:
+                # Minutes only count when they follow a number, e.g. "20 min"
+                if position == 0 or not tokens[position - 1].isdecimal():
+                    continue
+                value = int(tokens[position - 1])
+            if feature not in best or rank < best[feature][0]:
+                best[feature] = (rank, value)
+
+        return {feature: best[feature][1] for feature in CONTEXT_FEATURES if feature in best}
 
     def generate_dynamic_workout(self, context: Dict, profile: 'UserProfile') -> str:
         """Generate adaptive workout based on context and profile"""
@@ -79,16 +266,16 @@ class EnhancedFitnessBot:
         time = context.get("time", profile.available_time)
         equipment = context.get("equipment", "bodyweight")
         
+        catalog = self.catalog
+        
         # Adjust difficulty based on energy
         if energy <= 4:
-            exercises = ["gentle stretching", "light yoga", "walking", "easy bodyweight movements"]
             intensity = "Low"
         elif energy >= 7:
-            exercises = ["HIIT circuit", "burpees", "jump squats", "mountain climbers"]
             intensity = "High"
         else:
-            exercises = ["squats", "push-ups", "lunges", "planks"]
             intensity = "Moderate"
+        exercises = catalog.workout_exercises[intensity.lower()]
             
         # Time-based modifications
         if time <= 10:
@@ -101,19 +288,19 @@ class EnhancedFitnessBot:
             workout_type = "Full"
             reps = "3 sets of 12-15 reps"
             
-        selected_exercise = random.choice(exercises)
+        selected_exercise = self.rng.choice(exercises)
         
         # Add variation if user has done this before
         if selected_exercise in profile.preferred_exercises:
-            if selected_exercise in self.workout_variations:
-                variation = random.choice(self.workout_variations[selected_exercise])
+            if selected_exercise in catalog.workout_variations:
+                variation = self.rng.choice(catalog.workout_variations[selected_exercise])
                 selected_exercise = f"{variation} (variation of {selected_exercise})"
         
         return f"🏋️ {workout_type} {intensity}-Intensity Workout ({time} min):\n{selected_exercise} - {reps}\n💡 Energy level: {energy}/10"
 
     def generate_meal_suggestion(self, context: Dict, profile: 'UserProfile') -> str:
         """Generate contextual meal suggestions"""
-        current_hour = datetime.datetime.now().hour
+        current_hour = self.now().hour
         budget = context.get("budget", profile.budget_range)
         
         # Determine meal type
@@ -124,36 +311,19 @@ class EnhancedFitnessBot:
         else:
             meal_type = "dinner"
             
-        # Budget-based suggestions
-        budget_meals = {
-            "low": {
-                "breakfast": "Oatmeal with banana and peanut butter (~$1.50)",
-                "lunch": "Lentil soup with whole grain bread (~$2.00)",
-                "dinner": "Rice and beans with vegetables (~$2.50)"
-            },
-            "medium": {
-                "breakfast": "Greek yogurt with berries and granola (~$3.00)",
-                "lunch": "Quinoa salad with chickpeas (~$4.00)",
-                "dinner": "Grilled chicken with sweet potato (~$5.00)"
-            },
-            "high": {
-                "breakfast": "Avocado toast with smoked salmon (~$8.00)",
-                "lunch": "Organic salad with grass-fed beef (~$12.00)",
-                "dinner": "Wild-caught fish with quinoa (~$15.00)"
-            }
-        }
+        catalog = self.catalog
         
         # Seasonal suggestions
         season = self.get_current_season()
-        seasonal_ingredient = random.choice(self.seasonal_foods[season])
+        seasonal_ingredient = self.rng.choice(catalog.seasonal_foods[season])
         
-        base_meal = budget_meals[budget][meal_type]
+        base_meal = catalog.budget_meals[budget][meal_type]
         
         return f"🍽️ {meal_type.title()} Suggestion:\n{base_meal}\n🌿 Seasonal twist: Add {seasonal_ingredient}\n💰 Budget: {budget.title()}"
 
     def get_current_season(self) -> str:
         """Determine current season"""
-        month = datetime.datetime.now().month
+        month = self.now().month
         if month in [12, 1, 2]:
             return "winter"
         elif month in [3, 4, 5]:
@@ -165,22 +335,20 @@ class EnhancedFitnessBot:
 
     def track_streaks(self, activity_type: str, profile: 'UserProfile') -> str:
         """Track and celebrate streaks"""
-        today = datetime.datetime.now().strftime("%Y-%m-%d")
-        
+        today = self.now().date()
+        log = profile.activity.get(activity_type)
+        if log is None:
+            log = profile.activity[activity_type] = ActivityLog()
+        # Several messages on one day don't extend the streak or change the profile
+        days = len(log)
+        streak = log.record(today)
         if activity_type == "workout":
-            if profile.last_workout_date:
-                last_date = datetime.datetime.strptime(profile.last_workout_date, "%Y-%m-%d")
-                if (datetime.datetime.now() - last_date).days == 1:
-                    profile.workout_streak += 1
-                else:
-                    profile.workout_streak = 1
-            else:
-                profile.workout_streak = 1
-            profile.last_workout_date = today
-            streak = profile.workout_streak
+            profile.workout_streak = streak
+            profile.last_workout_date = today.strftime("%Y-%m-%d")
         else:  # nutrition
-            profile.nutrition_streak += 1
-            streak = profile.nutrition_streak
+            profile.nutrition_streak = streak
+        if len(log) != days:
+            self._profile_changed(profile)
             
         # Celebration messages
         if streak == 1:
@@ -196,44 +364,30 @@ class EnhancedFitnessBot:
 
     def generate_smart_goals(self, user_input: str) -> str:
         """Convert vague goals to SMART goals"""
-        goal_templates = {
-            "lose weight": "Lose 1-2 pounds per week through 150 minutes of cardio + strength training 3x/week",
-            "get fit": "Complete 30-minute workouts 4 times per week for the next 8 weeks",
-            "build muscle": "Increase strength by 10% in major lifts over 12 weeks with progressive overload",
-            "eat healthy": "Eat 5 servings of fruits/vegetables daily and meal prep 3 days per week",
-            "sleep better": "Maintain 7-8 hours sleep nightly with consistent bedtime for 4 weeks"
-        }
-        
-        for vague_goal, smart_goal in goal_templates.items():
+        for vague_goal, smart_goal in self.catalog.smart_goals:
             if vague_goal in user_input.lower():
                 return f"🎯 SMART Goal Conversion:\nFrom: '{vague_goal}'\nTo: '{smart_goal}'\n📅 Let's break this into weekly milestones!"
                 
         return "🎯 Let's make your goal SMART (Specific, Measurable, Achievable, Relevant, Time-bound)! What exactly do you want to achieve?"
 
+    def mood_activity(self, mood: str) -> str:
+        """Activity suggested for a mood"""
+        return self.catalog.mood_activities.get(mood, "balanced workout")
+
     def mood_fitness_correlation(self, mood: str, profile: 'UserProfile') -> str:
         """Track mood and suggest appropriate activities"""
-        mood_activities = {
-            "stressed": "Try gentle yoga or a 10-minute walk to reduce cortisol levels",
-            "sad": "Light cardio like dancing can boost endorphins naturally",
-            "anxious": "Deep breathing exercises combined with stretching",
-            "angry": "High-intensity workout to channel energy positively",
-            "tired": "Gentle movement like tai chi or light stretching",
-            "excited": "Perfect energy for a challenging HIIT workout!"
-        }
+        activity = self.mood_activity(mood)
         
         # Log mood
-        profile.mood_history.append({
-            "date": datetime.datetime.now().strftime("%Y-%m-%d"),
-            "mood": mood,
-            "activity_suggested": mood_activities.get(mood, "balanced workout")
-        })
+        profile.mood_history.log(self.now().date(), mood, activity)
+        self._profile_changed(profile)
         
-        return f"😊 Mood-based suggestion: {mood_activities.get(mood, 'balanced workout')}"
+        return f"😊 Mood-based suggestion: {activity}"
 
     def hydration_intelligence(self, context: Dict) -> str:
         """Smart hydration recommendations"""
         base_water = 8  # glasses
-        current_hour = datetime.datetime.now().hour
+        current_hour = self.now().hour
         
         # Time-based adjustments
         if current_hour < 12:
@@ -255,36 +409,27 @@ class EnhancedFitnessBot:
     def exercise_variation_engine(self, exercise: str, profile: 'UserProfile') -> str:
         """Prevent boredom with exercise variations"""
         if exercise in profile.preferred_exercises:
-            if exercise in self.workout_variations:
-                variations = self.workout_variations[exercise]
-                new_variation = random.choice(variations)
+            variations = self.catalog.workout_variations.get(exercise)
+            if variations:
+                new_variation = self.rng.choice(variations)
                 return f"🔄 Variation Alert! Instead of regular {exercise}, try: {new_variation}"
         
         # Add to preferred exercises
         if exercise not in profile.preferred_exercises:
             profile.preferred_exercises.append(exercise)
+            self._profile_changed(profile)
             
         return f"✅ Added {exercise} to your exercise history for future variations!"
 
     def generate_weekly_challenge(self) -> str:
         """Create engaging weekly challenges"""
-        challenges = [
-            "Stair Master: Take stairs instead of elevators all week",
-            "Phone Fitness: 10 squats every time you check your phone",
-            "Hydration Hero: Drink water before every meal",
-            "Plank Power: Hold a 2-minute plank 3 times this week",
-            "Lunch Walker: 10-minute walk after lunch daily",
-            "Morning Mover: 5-minute stretch routine every morning",
-            "Snack Swapper: Replace one unhealthy snack daily with fruit"
-        ]
-        
-        challenge = random.choice(challenges)
+        challenge = self.rng.choice(self.catalog.weekly_challenges)
         return f"🎯 This Week's Challenge: {challenge}\n🏆 Complete it for bonus motivation points!"
 
     def intelligent_reminders(self, profile: 'UserProfile') -> str:
         """Context-aware reminders"""
-        current_hour = datetime.datetime.now().hour
-        day_of_week = datetime.datetime.now().strftime("%A")
+        current_hour = self.now().hour
+        day_of_week = self.now().strftime("%A")
         
         if current_hour == 7:
             return "🌅 Morning Reminder: Perfect time for a energizing workout!"
@@ -308,98 +453,90 @@ class EnhancedFitnessBot:
         else:
             return "🔄 Recovery Integration:\n• 5-min cool down after workouts\n• Stretch major muscle groups\n• Stay hydrated"
 
-# Enhanced Streamlit Integration
-def get_enhanced_response(user_input: str) -> str:
-    """Main function to get enhanced chatbot response"""
-    if 'enhanced_bot' not in st.session_state:
-        st.session_state.enhanced_bot = EnhancedFitnessBot()
-    if 'user_profile' not in st.session_state:
-        st.session_state.user_profile = UserProfile()
-    
-    bot = st.session_state.enhanced_bot
-    profile = st.session_state.user_profile
-    
-    # Extract context from user input
-    context = bot.extract_context(user_input)
-    
-    # Update profile with context
-    if "energy" in context:
-        profile.energy_level = context["energy"]
-    if "time" in context:
-        profile.available_time = context["time"]
-    if "budget" in context:
-        profile.budget_range = context["budget"]
-    
-    # Determine response type and generate appropriate response
-    user_lower = user_input.lower()
-    
-    if any(word in user_lower for word in ["workout", "exercise", "gym", "training"]):
-        response = bot.generate_dynamic_workout(context, profile)
-        response += "\n\n" + bot.track_streaks("workout", profile)
-        
-    elif any(word in user_lower for word in ["meal", "food", "eat", "nutrition", "diet"]):
-        response = bot.generate_meal_suggestion(context, profile)
-        response += "\n\n" + bot.track_streaks("nutrition", profile)
-        
-    elif any(word in user_lower for word in ["goal", "target", "achieve", "want to"]):
-        response = bot.generate_smart_goals(user_input)
-        
-    elif any(word in user_lower for word in ["challenge", "motivate", "motivation"]):
-        response = bot.generate_weekly_challenge()
-        
-    elif any(word in user_lower for word in ["water", "hydration", "drink"]):
-        response = bot.hydration_intelligence(context)
-        
-    elif any(word in user_lower for word in ["tired", "stressed", "sad", "anxious", "angry", "excited"]):
-        mood = next((word for word in ["tired", "stressed", "sad", "anxious", "angry", "excited"] if word in user_lower), "neutral")
-        response = bot.mood_fitness_correlation(mood, profile)
-        
-    elif any(word in user_lower for word in ["recovery", "rest", "sore", "tired muscles"]):
-        response = bot.recovery_optimization(context, profile)
-        
-    elif "reminder" in user_lower:
-        response = bot.intelligent_reminders(profile)
-        
-    else:
-        # Fallback to original chatbot rules
-        response = "I can help with personalized workouts, meal planning, goal setting, challenges, hydration, mood-based fitness, and recovery! What interests you? 🤖"
-    
-    # Remember conversation
-    bot.conversation_memory.append({
-        'timestamp': datetime.datetime.now(),
-        'user': user_input,
-        'bot': response,
-        'context': context
-    })
-    
-    return response
-
-# Original chatbot rules for fallback
-chatbot_rules = {
-    r".*\b(hi|hello|hey|greetings)\b.*": {
-        'response': "Hello! 👋 I'm your enhanced fitness companion with personalized workouts, meal planning, and smart goal tracking!",
-        'intent': 'greeting'
-    },
-    r".*\b(help)\b.*": {
-        'response': "I can help with:\n🏋️ Dynamic workouts\n🍽️ Smart meal planning\n🎯 Goal setting\n💧 Hydration tracking\n😊 Mood-based fitness\n🏆 Weekly challenges\n⚡ Recovery optimization",
-        'intent': 'help'
-    },
-    r".*\b(thank you|thanks)\b.*": {
-        'response': "You're welcome! Keep crushing your fitness goals! 🙌",
-        'intent': 'thank_you'
-    },
-    r".*\b(bye|goodbye|exit|quit)\b.*": {
-        'response': "Goodbye! Stay consistent and remember - progress over perfection! 👋",
-        'intent': 'exit'
-    }
+# Intent routing table: handlers are tried in the order listed here
+def _workout_route(bot, user_input, context, profile, keyword):
+    response = bot.generate_dynamic_workout(context, profile)
+    return response + "\n\n" + bot.track_streaks("workout", profile)
+
+def _meal_route(bot, user_input, context, profile, keyword):
+    response = bot.generate_meal_suggestion(context, profile)
+    return response + "\n\n" + bot.track_streaks("nutrition", profile)
+
+def _goal_route(bot, user_input, context, profile, keyword):
+    return bot.generate_smart_goals(user_input)
+
+def _challenge_route(bot, user_input, context, profile, keyword):
+    return bot.generate_weekly_challenge()
+
+def _hydration_route(bot, user_input, context, profile, keyword):
+    return bot.hydration_intelligence(context)
+
+def _mood_route(bot, user_input, context, profile, keyword):
+    return bot.mood_fitness_correlation(keyword, profile)
+
+def _recovery_route(bot, user_input, context, profile, keyword):
+    return bot.recovery_optimization(context, profile)
+
+def _reminder_route(bot, user_input, context, profile, keyword):
+    return bot.intelligent_reminders(profile)
+
+# Guessed routes answer without logging anything, and ask for the exact word
+GUESS_NOTE = "🤔 Did you mean \"{keyword}\"? Say it that way and I'll {action}."
+
+def _workout_guess(bot, user_input, context, profile, keyword):
+    response = bot.generate_dynamic_workout(context, profile)
+    return response + "\n\n" + GUESS_NOTE.format(keyword=keyword, action="count it towards your workout streak")
+
+def _meal_guess(bot, user_input, context, profile, keyword):
+    response = bot.generate_meal_suggestion(context, profile)
+    return response + "\n\n" + GUESS_NOTE.format(keyword=keyword, action="count it towards your nutrition streak")
+
+def _mood_guess(bot, user_input, context, profile, keyword):
+    response = f"😊 Mood-based suggestion: {bot.mood_activity(keyword)}"
+    return response + "\n\n" + GUESS_NOTE.format(keyword=keyword, action="log your mood")
+
+# (name, keywords, handler, cache_on). cache_on lists what the response
+# depends on besides the message (see CACHE_DEPENDENCIES); None = never cache.
+# Keywords match whole tokens; plurals and the ROUTE_SUFFIXES inflections
+# find their keyword ("dieting", "sadness"), other forms are listed
+INTENT_ROUTES = [
+    ("workout", ["workout", "exercise", "exercising", "gym", "gymnastics", "training"], _workout_route, None),
+    ("meal", ["meal", "food", "eat", "eating", "eaten", "nutrition", "diet"], _meal_route, None),
+    ("goal", ["goal", "target", "achieve", "achieved", "achieving", "achievement", "want to"],
+     _goal_route, ()),
+    ("challenge", ["challenge", "challenging", "motivate", "motivated", "motivating", "motivation",
+                   "motivational"], _challenge_route, None),
+    ("hydration", ["water", "hydration", "hydrate", "hydrated", "drink", "drinking"], _hydration_route,
+     ("hour",)),
+    ("mood", ["tired", "stressed", "sad", "anxious", "angry", "excited"], _mood_route, None),
+    ("recovery", ["recovery", "rest", "resting", "rested", "sore", "soreness", "tired muscles"],
+     _recovery_route, ("active_streak",)),
+    ("reminder", ["reminder"], _reminder_route, ("hour", "weekday")),
+]
+
+CACHE_DEPENDENCIES = {
+    "hour": lambda profile, now: now.hour,
+    "weekday": lambda profile, now: now.weekday(),
+    "budget": lambda profile, now: profile.budget_range,
+    "energy": lambda profile, now: ("low" if profile.energy_level <= 4
+                                    else "high" if profile.energy_level >= 7 else "moderate"),
+    "active_streak": lambda profile, now: profile.workout_streak >= 5,
 }
 
-def get_fallback_response(user_input: str) -> str:
-    """Fallback to original rule-based responses"""
-    cleaned_input = re.sub(r'[^\w\s]', '', user_input.lower())
-    
-    for pattern, rule_data in chatbot_rules.items():
-        if re.search(pattern, cleaned_input):
-            return rule_data['response']
-    
-    return "I'm here to help with your fitness journey! Try asking about workouts, meals, goals, or challenges! 🤖"
\ No newline at end of file
+# Routes whose handler changes the profile -> the handler for guessed messages
+GUESS_HANDLERS = {"workout": _workout_guess, "meal": _meal_guess, "mood": _mood_guess}
+
+# Inflections a route keyword also matches as, and keywords that only
+# match as written because their inflections mean something else
+# ("watering" the plants, "watered down")
+ROUTE_SUFFIXES = ("ing", "ed", "d", "al", "ary", "ness")
+UNSTEMMED_KEYWORDS = ["water"]
+
+# New features register here (or call intent_router.register elsewhere)
+intent_router = IntentRouter(ROUTE_SUFFIXES, UNSTEMMED_KEYWORDS)
+for name, keywords, handler, cache_on in INTENT_ROUTES:
+    intent_router.register(name, keywords, handler, cache_on=cache_on, guess_handler=GUESS_HANDLERS.get(name))
+
+# Shared by every bot in the process; keys never include per-user state
+# beyond the declared dependencies
+response_cache = ResponseCache()
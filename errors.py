@@ -0,0 +1,10 @@
+"""
+Exceptions shared by the server and the worker pool
+
+Kept apart from worker_pool so the single-process server can catch
+WorkerError without importing multiprocessing.
+"""
+
+
+class WorkerError(RuntimeError):
+    """A worker failed to answer, e.g. because it died mid-request"""
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Compile the legacy rule table into rules.json for the static demo page
+
+    python export_rules.py           # rewrite rules.json after editing chatbot_rules
+    python export_rules.py --check   # exit 1 if rules.json is out of date
+
+index.html loads rules.json and answers with rule_matcher.js, a port of
+chatbot.get_rule_response(), so the demo never calls a server. The
+artifact holds every rule in priority order (its phrases, intent and
+response), the default reply and the dialogue follow-ups.
+check_rule_parity.py runs both matchers over the same conversations.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict
+
+from chatbot import chatbot_rules, rule_matcher
+from dialogue import TRANSITIONS
+from intent_matcher import _RULE_PATTERN
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+FORMAT_VERSION = 1
+
+
+def compile_rules() -> Dict:
+    """The artifact as a dict; rule order is match priority"""
+    return {
+        "version": FORMAT_VERSION,
+        "rules": [{"phrases": _RULE_PATTERN.match(pattern).group(1).split("|"),
+                   "intent": rule_data["intent"], "response": rule_data["response"]}
+                  for pattern, rule_data in rule_matcher.rules],
+        "default": {"intent": chatbot_rules["default"]["intent"],
+                    "response": chatbot_rules["default"]["response"]},
+        # intent -> [[trigger words, response, next intent]], as in dialogue.TRANSITIONS
+        "transitions": {intent: [[list(triggers), response, next_intent]
+                                 for triggers, response, next_intent in options]
+                        for intent, options in TRANSITIONS.items()},
+    }
+
+
+def render(artifact: Dict) -> str:
+    return json.dumps(artifact, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the client-side rule artifact")
+    parser.add_argument("--output", default=RULES_PATH)
+    parser.add_argument("--check", action="store_true", help="only verify the artifact is current")
+    args = parser.parse_args()
+
+    text = render(compile_rules())
+    if args.check:
+        try:
+            with open(args.output, encoding="utf-8") as f:
+                current = f.read() == text
+        except FileNotFoundError:
+            current = False
+        if not current:
+            print(f"❌ {args.output} is out of date; run python export_rules.py")
+            sys.exit(1)
+        print(f"✅ {args.output} matches chatbot_rules")
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"✅ Wrote {len(rule_matcher.rules)} rules ({len(text.encode('utf-8'))} bytes) to {args.output}")
@@ -0,0 +1,116 @@
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+# Misspellings allowed for a token of at least this many characters;
+# shorter tokens are too easily confused with other words to correct
+EDIT_BOUNDS = [(8, 2), (6, 1)]
+
+# Real words that are never corrected, one per line
+COMMON_WORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "common_words.txt")
+
+
+def load_words(path: str = COMMON_WORDS_PATH) -> Set[str]:
+    """The words listed in a file, skipping blank lines and # comments"""
+    with open(path, encoding="utf-8") as f:
+        return {line.strip().lower() for line in f if line.strip() and not line.startswith("#")}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (a swap of neighbours counts once).
+
+    Returns limit + 1 as soon as the distance is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2]
+                    and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(word: str, depth: int) -> Set[str]:
+    """word with up to `depth` characters removed, including word itself"""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - found
+        found |= frontier
+    return found
+
+
+class SpellingIndex:
+    """Symmetric-delete index for correcting misspelled keywords.
+
+    Every vocabulary word is stored under each string it turns into with
+    up to two characters deleted. A token's own deletions then lead
+    straight to every word within the edit bound, so a lookup does a
+    fixed number of hash probes instead of scanning the vocabulary, and
+    only the few candidates found are checked with edit_distance().
+    Results are cached per token. Tokens in `real_words` (e.g.
+    load_words()) are spelled correctly already and never corrected.
+    """
+
+    def __init__(self, words: Iterable[str], cache_size: int = 10000, real_words: Iterable[str] = ()):
+        self.words = sorted(set(words))
+        self.max_distance = max(distance for _, distance in EDIT_BOUNDS)
+        self._index: Dict[str, List[str]] = {}
+        for word in self.words:
+            for variant in _deletes(word, self.max_distance):
+                self._index.setdefault(variant, []).append(word)
+        self._known = set(self.words) | set(real_words)
+        self._cache: Dict[str, Optional[str]] = {}
+        self.cache_size = cache_size
+
+    @staticmethod
+    def bound(token: str) -> int:
+        """Edit distance allowed when correcting this token"""
+        for min_length, distance in EDIT_BOUNDS:
+            if len(token) >= min_length:
+                return distance
+        return 0
+
+    def correct(self, token: str) -> Optional[str]:
+        """The closest vocabulary word within the token's bound, or None.
+
+        Ties go to a word with the same first letter, then alphabetical
+        order. Vocabulary words, real words and words that can't be
+        corrected give None.
+        """
+        if token in self._cache:
+            return self._cache[token]
+        best = None
+        limit = self.bound(token)
+        if limit and token not in self._known and token.isalpha():
+            best_key = None
+            candidates = {word for variant in _deletes(token, limit) for word in self._index.get(variant, ())}
+            for word in candidates:
+                distance = edit_distance(token, word, limit)
+                if distance <= limit:
+                    key = (distance, word[0] != token[0], word)
+                    if best_key is None or key < best_key:
+                        best, best_key = word, key
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[token] = best
+        return best
+
+    def correct_tokens(self, tokens: List[str]) -> Optional[List[str]]:
+        """tokens with misspellings fixed, or None if nothing was corrected"""
+        corrected = None
+        for i, token in enumerate(tokens):
+            word = self.correct(token)
+            if word is not None:
+                if corrected is None:
+                    corrected = list(tokens)
+                corrected[i] = word
+        return corrected
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Hashed character n-gram intent classifier
+
+    python intent_classifier.py train --logs turns.jsonl      # writes intent_model.npz
+    python intent_classifier.py evaluate --logs turns.jsonl   # precision on unseen messages, µs per message
+
+A linear model over hashed character 3- and 4-grams plus whole words.
+Scoring a message is one product of the weight columns of its n-grams
+with their counts, and a batch is one matrix product. It answers only
+messages that no keyword, rule or typo correction matched (see
+chatbot.respond), and only above a confidence threshold.
+
+Labels are "route:<route>:<keyword>" (an enhanced route, with the
+keyword its handler receives), "rule:<intent>" (a legacy rule) or
+"fallback" (nothing fits: keep the default reply). Its answers are
+guesses, so routes that change the profile answer them without saving
+anything (see Route.guess_handler).
+
+Character n-grams recognize misspelled and mangled keywords ("slep",
+"mealz"), not paraphrases without them: `evaluate` measures both on
+messages never used in training.
+"""
+
+import argparse
+import json
+import os
+import random
+import timeit
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from lexer import tokenize
+
+MODEL_PATH = os.environ.get(
+    "FITNESS_BOT_INTENT_MODEL", os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_model.npz"))
+FALLBACK_LABEL = "fallback"
+NGRAM_SIZES = (3, 4)
+
+# Training phrasings wrapped around every keyword and rule phrase
+TEMPLATES = ["{}", "{} please", "i need {}", "help me with {}", "tell me about {}", "any {} tips",
+             "what about {}", "can you help with {}", "i want {}", "give me some {}"]
+# Off-topic messages the model should leave to the default reply
+NEGATIVE_EXAMPLES = [
+    "what's the weather like", "tell me a joke", "who won the game last night", "what time is it",
+    "i like turtles", "can you book a flight", "what is the capital of france", "play some music",
+    "how do i fix my car", "asdf qwerty", "my cat is sleeping on the keyboard", "what's the news today",
+    "translate this into spanish", "open the pod bay doors", "how old is the universe", "ok",
+    "lol", "hmm", "nothing", "what do you think about politics", "i bought a new phone",
+    "the train was late again", "recommend a good movie", "where is the nearest bank",
+]
+# Answers below this confidence keep the default reply; see `evaluate`
+THRESHOLD = 0.7
+# Messages for `evaluate` that share no keyword or rule phrase with the
+# training data: (message, intents that would be right). An empty set
+# means the message should keep the default reply.
+PARAPHRASES = [
+    ("I'd like to get fit at home", {"workout"}),
+    ("plan a session of squats and lunges for me", {"workout"}),
+    ("what should I do to get in shape", {"workout"}),
+    ("a routine for my legs today", {"workout"}),
+    ("push ups and planks for me", {"workout", "beginner_workout"}),
+    ("how do I get stronger arms", {"strength_workout", "workout"}),
+    ("I'd love to start running longer distances", {"cardio_workout"}),
+    ("how can I bend and touch my toes", {"flexibility"}),
+    ("I'm new to lifting", {"beginner_workout"}),
+    ("how do I bulk up", {"strength_workout"}),
+    ("should I go jogging or swimming", {"cardio_workout"}),
+    ("how to loosen up before lifting", {"workout_prep", "flexibility"}),
+    ("how often should I train", {"workout_frequency"}),
+    ("what should I cook tonight", {"meal", "dinner_ideas"}),
+    ("ideas for a morning bite", {"breakfast_ideas", "meal"}),
+    ("something light to munch between classes", {"snack_ideas"}),
+    ("what should I have at noon", {"lunch_ideas", "meal"}),
+    ("cooking in bulk on sunday", {"meal_prep"}),
+    ("how much should I weigh", {"weight_calories"}),
+    ("how many grams of carbohydrate", {"macros"}),
+    ("I keep waking up at 3am", {"insomnia_help", "sleep_tips"}),
+    ("how do I nod off faster", {"sleep_tips", "insomnia_help"}),
+    ("I toss and turn all night", {"insomnia_help", "sleep_tips"}),
+    ("how long should adults stay in bed", {"sleep_duration", "sleep_tips"}),
+    ("I'm feeling down today", {"mood"}),
+    ("I'm so worn out", {"mood", "recovery"}),
+    ("I feel really nervous", {"mood"}),
+    ("I'm furious at my boss", {"mood"}),
+    ("how many glasses a day", {"hydration"}),
+    ("am I getting enough fluids", {"hydration"}),
+    ("I'm always thirsty after running", {"hydration"}),
+    ("my legs ache after yesterday", {"recovery"}),
+    ("should I take a day off", {"recovery"}),
+    ("my muscles feel stiff", {"recovery"}),
+    ("how to bounce back after a long run", {"recovery"}),
+    ("I'd like to lose ten pounds by summer", {"goal", "weight_calories"}),
+    ("I hope to be able to do a pull up", {"goal"}),
+    ("set an objective for this month", {"goal"}),
+    ("give me something hard to try this week", {"challenge"}),
+    ("I need a push to keep going", {"challenge", "motivation"}),
+    ("inspire me", {"challenge", "motivation"}),
+    ("I lost my drive", {"challenge", "motivation"}),
+    ("nudge me later", {"reminder"}),
+    ("ping me at 6 to move", {"reminder"}),
+    ("good morning", {"greeting"}),
+    ("howdy", {"greeting"}),
+    ("much appreciated", {"thank_you"}),
+    ("cheers for that", {"thank_you"}),
+    ("talk to you later", {"exit"}),
+    ("I'm off now", {"exit"}),
+    ("what can you do", {"help", "app_features"}),
+    ("does this log my runs", {"app_features"}),
+    ("bench press form", {"strength_workout", "workout"}),
+    # Off-topic
+    ("what's on tv tonight", set()),
+    ("my laptop won't turn on", set()),
+    ("who is the president", set()),
+    ("book a table for two", set()),
+    ("the bus is late", set()),
+    ("I love my dog", set()),
+    ("how tall is everest", set()),
+    ("write me a poem", set()),
+    ("what's 2 plus 2", set()),
+    ("I'm going to the bank", set()),
+    ("it's raining outside", set()),
+    ("draining day at the office", set()),
+    ("I'm testing the app", set()),
+    ("you're a winner", set()),
+    ("product launch tomorrow", set()),
+    ("the stock market crashed", set()),
+    ("where did I park", set()),
+    ("I need a haircut", set()),
+    ("send an email to mom", set()),
+    ("let's play chess", set()),
+    ("the movie was great", set()),
+    ("my phone battery died", set()),
+    ("buy milk on the way home", set()),
+    ("how do magnets work", set()),
+    ("what's your favourite colour", set()),
+]
+
+
+def features(text: str, dim: int) -> Tuple[List[int], List[float]]:
+    """Hashed n-gram columns of a message and their L2-normalized counts"""
+    tokens = tokenize(text)
+    padded = f" {' '.join(tokens)} "
+    grams = [padded[i:i + n] for n in NGRAM_SIZES for i in range(len(padded) - n + 1)]
+    grams += ["#" + token for token in tokens]
+    counts: Dict[int, int] = {}
+    mask = dim - 1
+    for gram in grams:
+        column = zlib.crc32(gram.encode("utf-8")) & mask
+        counts[column] = counts.get(column, 0) + 1
+    norm = sum(count * count for count in counts.values()) ** 0.5 or 1.0
+    return list(counts), [count / norm for count in counts.values()]
+
+
+class IntentClassifier:
+    """Weights (labels x hashed features) plus a bias per label"""
+
+    def __init__(self, weights, bias, labels: Sequence[str], threshold: float = THRESHOLD):
+        self.weights = weights
+        self.bias = bias
+        self.labels = list(labels)
+        self.dim = weights.shape[1]
+        self.threshold = threshold
+
+    def _probabilities(self, scores):
+        import numpy as np
+        scores = scores - scores.max(axis=-1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def scores(self, text: str):
+        """Probability of every label for one message"""
+        import numpy as np
+        columns, values = features(text, self.dim)
+        return self._probabilities(self.weights[:, columns] @ np.asarray(values, dtype=self.weights.dtype)
+                                   + self.bias)
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """(label, confidence); the label is None below the threshold or for fallback"""
+        probabilities = self.scores(text)
+        best = int(probabilities.argmax())
+        return self._decide(best, float(probabilities[best]))
+
+    def predict_batch(self, texts: Sequence[str]) -> List[Tuple[Optional[str], float]]:
+        """predict() for many messages with a single matrix product"""
+        import numpy as np
+        matrix = self.encode(texts)
+        probabilities = self._probabilities(matrix @ self.weights.T + self.bias)
+        best = probabilities.argmax(axis=1)
+        return [self._decide(int(label), float(probabilities[row, label])) for row, label in enumerate(best)]
+
+    def encode(self, texts: Sequence[str]):
+        """Feature matrix (messages x dim) for a batch"""
+        import numpy as np
+        matrix = np.zeros((len(texts), self.dim), dtype=self.weights.dtype)
+        for row, text in enumerate(texts):
+            columns, values = features(text, self.dim)
+            matrix[row, columns] = values
+        return matrix
+
+    def _decide(self, index: int, confidence: float) -> Tuple[Optional[str], float]:
+        label = self.labels[index]
+        if label == FALLBACK_LABEL or confidence < self.threshold:
+            return None, confidence
+        return label, confidence
+
+    def save(self, path: str = MODEL_PATH):
+        import numpy as np
+        np.savez_compressed(path, weights=self.weights.astype(np.float16), bias=self.bias,
+                            labels=np.array(self.labels), threshold=self.threshold)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> 'IntentClassifier':
+        import numpy as np
+        with np.load(path) as model:
+            return cls(model["weights"].astype(np.float32), model["bias"].astype(np.float32),
+                       [str(label) for label in model["labels"]], float(model["threshold"]))
+
+    @classmethod
+    def train(cls, examples: Sequence[Tuple[str, str]], dim: int = 2048, epochs: int = 1000,
+              learning_rate: float = 8.0, l2: float = 1e-5, threshold: float = THRESHOLD) -> 'IntentClassifier':
+        """Softmax regression by full-batch gradient descent over (text, label) pairs"""
+        import numpy as np
+        labels = sorted({label for _, label in examples})
+        label_ids = {label: index for index, label in enumerate(labels)}
+        model = cls(np.zeros((len(labels), dim), dtype=np.float32), np.zeros(len(labels), dtype=np.float32),
+                    labels, threshold)
+        matrix = model.encode([text for text, _ in examples])
+        targets = np.zeros((len(examples), len(labels)), dtype=np.float32)
+        targets[np.arange(len(examples)), [label_ids[label] for _, label in examples]] = 1.0
+        for _ in range(epochs):
+            error = (model._probabilities(matrix @ model.weights.T + model.bias) - targets) / len(examples)
+            model.weights -= learning_rate * (error.T @ matrix + l2 * model.weights)
+            model.bias -= learning_rate * error.sum(axis=0)
+        return model
+
+
+_classifier: Optional[IntentClassifier] = None
+_loaded = False
+
+
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    """The trained model at MODEL_PATH, loaded on first use; None if there is none"""
+    global _classifier, _loaded
+    if not _loaded:
+        if os.path.exists(MODEL_PATH):
+            _classifier = IntentClassifier.load(MODEL_PATH)
+        _loaded = True
+    return _classifier
+
+
+# --- Offline training data ---
+
+def exact_label(text: str) -> Optional[str]:
+    """The label of whatever answers the text without the classifier"""
+    from chatbot import clean_input, match_rule
+    from enhanced_bot import intent_router
+
+    matched = intent_router.route(tokenize(text))
+    if matched:
+        return f"route:{matched[0].name}:{matched[1]}"
+    rule_data = match_rule(clean_input(text))
+    return f"rule:{rule_data['intent']}" if rule_data else None
+
+
+def rule_examples(templates: Sequence[str] = TEMPLATES,
+                  negatives: Sequence[str] = NEGATIVE_EXAMPLES) -> List[Tuple[str, str]]:
+    """Every route keyword and legacy rule phrase, in each template.
+
+    A phrase is labelled with what answers it exactly (routes win over
+    rules, earlier rules over later ones), so the model agrees with the
+    exact matchers.
+    """
+    from chatbot import rule_matcher
+    from enhanced_bot import intent_router
+    from intent_matcher import _RULE_PATTERN
+
+    phrases = [keyword for route in intent_router.routes for keyword in route.keywords]
+    for pattern, _ in rule_matcher.rules:
+        phrases += _RULE_PATTERN.match(pattern).group(1).split("|")
+    examples = []
+    for phrase in dict.fromkeys(phrases):
+        label = exact_label(phrase)
+        if label is not None:
+            examples += [(template.format(phrase), label) for template in templates]
+    examples += [(text, FALLBACK_LABEL) for text in negatives]
+    return examples
+
+
+def log_examples(paths: Iterable[str]) -> Iterable[Tuple[str, str]]:
+    """Labelled messages from exported turn logs (see conversation_log.py).
+
+    Route turns are labelled with the keyword the router picks for the
+    text (after typo correction); turns that got a default reply become
+    fallback examples. Turns the classifier itself answered are skipped,
+    so its mistakes are never learned back.
+    """
+    from analytics import FALLBACK_INTENTS, iter_records
+    from chatbot import rule_matcher, spelling_index
+    from content import get_content_store
+    from enhanced_bot import intent_router
+
+    routes = {route.name for route in intent_router.routes}
+    rule_intents = {rule_data["intent"] for _, rule_data in rule_matcher.rules}
+    spelling = spelling_index(get_content_store().current)
+    for path in paths:
+        for record in iter_records(path):
+            if not record or not record.get("user") or not record.get("intent"):
+                continue
+            if record.get("matched_by") == "classifier":
+                continue
+            text, intent = record["user"], record["intent"]
+            if intent in FALLBACK_INTENTS:
+                yield text, FALLBACK_LABEL
+            elif intent in routes:
+                tokens = tokenize(text)
+                matched = intent_router.route(spelling.correct_tokens(tokens) or tokens)
+                if matched and matched[0].name == intent:
+                    yield text, f"route:{intent}:{matched[1]}"
+            elif intent in rule_intents:
+                yield text, f"rule:{intent}"
+
+
+def intent_of(label: str) -> str:
+    """The route name or rule intent of a label"""
+    kind, _, name = label.partition(":")
+    return name.partition(":")[0] if kind == "route" else name
+
+
+def reaches_classifier(text: str) -> bool:
+    """True if neither exact matching nor typo correction answers the text"""
+    from chatbot import spelling_index
+    from content import get_content_store
+
+    if exact_label(text) is not None:
+        return False
+    corrected = spelling_index(get_content_store().current).correct_tokens(tokenize(text))
+    return corrected is None or exact_label(" ".join(corrected)) is None
+
+
+def misspelled_examples(seed: int = 7) -> List[Tuple[str, set]]:
+    """Every keyword and rule phrase with one random edit, where only the classifier could answer it"""
+    rng = random.Random(seed)
+    examples = []
+    for text, label in rule_examples(["{}"], []):
+        i = rng.randrange(len(text))
+        edit = rng.randrange(3)
+        letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        mangled = (text[:i] + letter + text[i:], text[:i] + text[i + 1:], text[:i] + letter + text[i + 1:])[edit]
+        if tokenize(mangled) and reaches_classifier(mangled):
+            examples.append((mangled, {intent_of(label)}))
+    return examples
+
+
+def score(classifier: IntentClassifier, examples: Sequence[Tuple[str, set]], threshold: float) -> Dict:
+    """Answers (right and wrong) on examples labelled with their acceptable intents"""
+    right = wrong = off_topic = 0
+    for (_, intents), (label, confidence) in zip(examples, classifier.predict_batch([t for t, _ in examples])):
+        if label is None or confidence < threshold:
+            continue
+        if not intents:
+            off_topic += 1
+        elif intent_of(label) in intents:
+            right += 1
+        else:
+            wrong += 1
+    on_topic = sum(1 for _, intents in examples if intents)
+    return {"on_topic": on_topic, "right": right, "wrong": wrong, "off_topic_answered": off_topic,
+            "precision": round(right / (right + wrong), 3) if right + wrong else None}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train or evaluate the n-gram intent classifier")
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--logs", nargs="*", default=[], help="exported turn logs to learn from")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--dim", type=int, default=2048, help="hashed feature columns (a power of two)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--thresholds", type=float, nargs="*", default=[0.5, 0.6, 0.7, 0.8, 0.9],
+                        help="confidence thresholds evaluate reports")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        examples = rule_examples() + list(log_examples(args.logs))
+        classifier = IntentClassifier.train(examples, dim=args.dim, threshold=args.threshold)
+        classifier.save(args.model)
+        print(f"✅ Trained on {len(examples)} examples, {len(classifier.labels)} labels -> {args.model}")
+    else:
+        # A fresh model without every fifth logged message, scored on messages it never saw
+        log = list(log_examples(args.logs))
+        training = rule_examples() + [example for i, example in enumerate(log) if i % 5]
+        classifier = IntentClassifier.train(training, dim=args.dim, threshold=min(args.thresholds))
+        unseen = [(text, intents) for text, intents in PARAPHRASES if reaches_classifier(text)]
+        test_sets = {"paraphrases": unseen, "misspellings": misspelled_examples()}
+        if log:
+            test_sets["logs"] = [(text, set() if label == FALLBACK_LABEL else {intent_of(label)})
+                                 for text, label in log[::5]]
+        for threshold in args.thresholds:
+            print(json.dumps({"threshold": threshold, **{name: score(classifier, examples, threshold)
+                                                         for name, examples in test_sets.items()}}))
+        texts = [text for examples in test_sets.values() for text, _ in examples]
+        single = min(timeit.repeat(lambda: [classifier.predict(text) for text in texts], number=1, repeat=3))
+        batch = min(timeit.repeat(lambda: classifier.predict_batch(texts), number=1, repeat=3))
+        print(json.dumps({"training": len(training), "predict_us": round(single / len(texts) * 1e6, 1),
+                          "predict_batch_us": round(batch / len(texts) * 1e6, 1)}))
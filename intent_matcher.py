@@ -0,0 +1,87 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+# Every rule pattern has the shape  .*\b(alt one|alt two|...)\b.*
+_RULE_PATTERN = re.compile(r"^\.\*\\b\((.*)\)\\b\.\*$")
+_WORD = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    start: int
+    end: int
+    rule_index: int
+    pattern: str
+    intent: str
+
+
+class IntentMatcher:
+    """Keyword trie compiled once from a chatbot_rules table.
+
+    The input is scanned a single time: each word starts a walk down the
+    trie, and every phrase that ends on a word boundary is reported.
+    Rules keep their dict order, so the lowest rule_index is the rule the
+    old `for pattern in rules: re.search(...)` loop would have returned.
+    """
+
+    def __init__(self, rules: Dict[str, Dict]):
+        self.rules = []
+        self._trie = {}
+        for pattern, rule_data in rules.items():
+            if pattern == "default":
+                continue
+            parsed = _RULE_PATTERN.match(pattern)
+            if not parsed:
+                raise ValueError(f"Unsupported rule pattern: {pattern!r}")
+            rule_index = len(self.rules)
+            self.rules.append((pattern, rule_data))
+            for phrase in parsed.group(1).split("|"):
+                self._add_phrase(phrase, rule_index)
+
+    def _add_phrase(self, phrase: str, rule_index: int):
+        node = self._trie
+        for word in phrase.split(" "):
+            node = node.setdefault(word, {})
+        # A phrase listed in several rules only needs the earliest one
+        node.setdefault(None, rule_index)
+
+    def vocabulary(self) -> Set[str]:
+        """Every word of every rule phrase"""
+        words = set()
+        nodes = [self._trie]
+        while nodes:
+            node = nodes.pop()
+            for word, child in node.items():
+                if word is not None:
+                    words.add(word)
+                    nodes.append(child)
+        return words
+
+    def find_all(self, cleaned_input: str) -> List[IntentMatch]:
+        """Return every rule phrase found in the input with its position"""
+        words = [(m.start(), m.end(), m.group()) for m in _WORD.finditer(cleaned_input)]
+        matches = []
+        for i, (start, _, word) in enumerate(words):
+            node = self._trie.get(word)
+            j = i
+            while node is not None:
+                end = words[j][1]
+                if None in node:
+                    rule_index = node[None]
+                    pattern, rule_data = self.rules[rule_index]
+                    matches.append(IntentMatch(start, end, rule_index, pattern, rule_data['intent']))
+                j += 1
+                # Multi-word phrases are separated by exactly one space
+                if j == len(words) or words[j][0] != end + 1 or cleaned_input[end] != " ":
+                    break
+                node = node.get(words[j][2])
+        return matches
+
+    def match(self, cleaned_input: str) -> Optional[Dict]:
+        """Return the rule data of the first rule (in table order) that matches"""
+        matches = self.find_all(cleaned_input)
+        if not matches:
+            return None
+        best = min(matches, key=lambda m: m.rule_index)
+        return self.rules[best.rule_index][1]
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from lexer import KeywordIndex
+
+# handler(bot, user_input, context, profile, keyword) -> response text
+Handler = Callable[..., str]
+
+
+@dataclass
+class Route:
+    name: str
+    keywords: List[str]
+    handler: Handler
+    priority: int
+    # Names of the values (besides the message) the response depends on;
+    # None means the handler changes state or is random and can't be cached
+    cache_on: Optional[Tuple[str, ...]] = None
+    # Answers instead of handler when the route was only guessed (typo
+    # correction, intent classifier); routes whose handler changes the
+    # profile give one that doesn't
+    guess_handler: Optional[Handler] = None
+
+
+class IntentRouter:
+    """Declarative keyword -> handler routing table.
+
+    All route keywords live in one KeywordIndex, so a message is resolved
+    with a single scan of its tokens however many routes are registered.
+    When several routes match, the lowest priority wins (ties go to the
+    route registered first); within a route the earliest listed keyword
+    is the one handed to the handler. `suffixes` and `unstemmed` set up
+    inflection matching, see KeywordIndex.
+    """
+
+    def __init__(self, suffixes: Sequence[str] = (), unstemmed: Iterable[str] = ()):
+        self.routes: List[Route] = []
+        self._index = KeywordIndex(suffixes, unstemmed)
+
+    def register(self, name: str, keywords: List[str], handler: Handler,
+                 priority: Optional[int] = None,
+                 cache_on: Optional[Tuple[str, ...]] = None,
+                 guess_handler: Optional[Handler] = None) -> Route:
+        """Add a route; without a priority it goes after every existing route"""
+        if priority is None:
+            priority = max((route.priority for route in self.routes), default=-1) + 1
+        route = Route(name, list(keywords), handler, priority, cache_on, guess_handler)
+        order = len(self.routes)
+        self.routes.append(route)
+        for keyword_rank, keyword in enumerate(route.keywords):
+            self._index.add(keyword, ((priority, order, keyword_rank), route, keyword))
+        return route
+
+    def vocabulary(self) -> Set[str]:
+        return self._index.vocabulary()
+
+    def route(self, tokens: List[str]) -> Optional[Tuple[Route, str]]:
+        """Return the winning (route, matched keyword) for the tokens, if any"""
+        best = None
+        for _, match in self._index.scan(tokens):
+            if best is None or match[0] < best[0]:
+                best = match
+        if best is None:
+            return None
+        return best[1], best[2]
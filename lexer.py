@@ -0,0 +1,65 @@
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+# Numbers, words (keeping inner apostrophes, e.g. "i'm") and single symbols
+# such as emoji. Hyphens separate words, so "high-end" is "high end".
+_TOKEN = re.compile(r"\d+|[^\W\d_]+(?:['’][^\W\d_]+)*|[^\w\s-]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case the text and split it into tokens in a single pass"""
+    return _TOKEN.findall(text.lower())
+
+
+class KeywordIndex:
+    """Hash index from keywords (single or multi-word) to feature values.
+
+    Each token is looked up once per phrase length, so scanning a message
+    costs O(tokens) no matter how many keywords are registered. Plurals
+    fall back to their singular form ("workouts" finds "workout"). With
+    `suffixes`, a word ending in one of them also finds the keyword it
+    starts with, with or without a dropped "e" ("dieting" finds "diet",
+    "exercising" finds "exercise"); keywords in `unstemmed` only match
+    as written.
+    """
+
+    def __init__(self, suffixes: Sequence[str] = (), unstemmed: Iterable[str] = ()):
+        self._index: Dict[str, List[Any]] = {}
+        self.max_words = 1
+        self.suffixes = tuple(suffixes)
+        self.unstemmed = set(unstemmed)
+
+    def add(self, keyword: str, value: Any):
+        words = tokenize(keyword)
+        self._index.setdefault(" ".join(words), []).append(value)
+        self.max_words = max(self.max_words, len(words))
+
+    def vocabulary(self) -> Set[str]:
+        """Every word of every keyword"""
+        return {word for phrase in self._index for word in phrase.split(" ")}
+
+    def lookup(self, phrase: str) -> List[Any]:
+        values = self._index.get(phrase)
+        if values is None and len(phrase) > 3 and phrase.endswith("s"):
+            values = self._index.get(phrase[:-1])
+        if values is None and self.suffixes and " " not in phrase:
+            values = self._stem_lookup(phrase)
+        return values or []
+
+    def _stem_lookup(self, word: str):
+        for suffix in self.suffixes:
+            # Roots shorter than three letters match too many words
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                root = word[:-len(suffix)]
+                for keyword in (root, root + "e"):
+                    if keyword in self._index and keyword not in self.unstemmed:
+                        return self._index[keyword]
+        return None
+
+    def scan(self, tokens: List[str]) -> Iterator[Tuple[int, Any]]:
+        """Yield (token position, value) for every keyword found in tokens"""
+        for i in range(len(tokens)):
+            for n in range(1, min(self.max_words, len(tokens) - i) + 1):
+                phrase = tokens[i] if n == 1 else " ".join(tokens[i:i + n])
+                for value in self.lookup(phrase):
+                    yield i, value
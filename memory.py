@@ -0,0 +1,101 @@
+import datetime
+import json
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+class Turn:
+    """One remembered exchange; __slots__ keeps each record small"""
+    __slots__ = ("timestamp", "user", "bot", "context", "intent", "matched_by")
+
+    def __init__(self, timestamp: float, user: str, bot: str, context: Optional[Dict] = None,
+                 intent: Optional[str] = None, matched_by: Optional[str] = None):
+        self.timestamp = timestamp
+        self.user = user
+        self.bot = bot
+        # Most turns carry no context, so don't keep an empty dict around
+        self.context = context or None
+        self.intent = intent
+        # Set when the intent came from a fallback tier, e.g. "classifier"
+        self.matched_by = matched_by
+
+    def to_dict(self) -> Dict:
+        return {
+            'timestamp': datetime.datetime.fromtimestamp(self.timestamp).isoformat(),
+            'user': self.user,
+            'bot': self.bot,
+            'context': self.context or {},
+            'intent': self.intent,
+            'matched_by': self.matched_by
+        }
+
+
+class ConversationMemory:
+    """Fixed-capacity ring buffer of conversation turns.
+
+    Appending is O(1) and never grows past `capacity`; once full, the
+    oldest turn is overwritten. If `spill_path` is set, evicted turns are
+    appended to that file as JSON lines instead of being dropped, and
+    `on_spill` (if set) is called with each of them.
+    """
+
+    def __init__(self, capacity: int = 50, spill_path: Optional[str] = None,
+                 on_spill: Optional[Callable[[Turn], None]] = None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.on_spill = on_spill
+        self.evicted = 0
+        self._turns: List[Optional[Turn]] = [None] * capacity
+        self._start = 0
+        self._size = 0
+
+    def append(self, user: str, bot: str, context: Optional[Dict] = None,
+               timestamp: Optional[float] = None, intent: Optional[str] = None,
+               matched_by: Optional[str] = None) -> Turn:
+        return self.add(Turn(time.time() if timestamp is None else timestamp, user, bot, context, intent,
+                             matched_by))
+
+    def add(self, turn: Turn) -> Turn:
+        """Append an existing Turn, e.g. one carried over from another memory"""
+        if self._size < self.capacity:
+            self._turns[(self._start + self._size) % self.capacity] = turn
+            self._size += 1
+        else:
+            self._spill(self._turns[self._start])
+            self._turns[self._start] = turn
+            self._start = (self._start + 1) % self.capacity
+            self.evicted += 1
+        return turn
+
+    def _spill(self, turn: Turn):
+        if self.on_spill is not None:
+            self.on_spill(turn)
+        if self.spill_path:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(turn.to_dict(), ensure_ascii=False) + "\n")
+
+    def last(self, n: int) -> List[Turn]:
+        """Return the newest n turns, oldest first"""
+        n = max(0, min(n, self._size))
+        return [self[i] for i in range(self._size - n, self._size)]
+
+    def clear(self):
+        self._turns = [None] * self.capacity
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> Turn:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("conversation memory index out of range")
+        return self._turns[(self._start + index) % self.capacity]
+
+    def __iter__(self) -> Iterator[Turn]:
+        for i in range(self._size):
+            yield self[i]
@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implied
+STAGE_BUCKETS = (5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 5e-2)
+
+# name -> (type, help text) for everything the engine records
+METRICS = {
+    "chatbot_stage_seconds": ("histogram", "Time spent in each stage of a turn"),
+    "chatbot_turns_total": ("counter", "Messages answered"),
+    "chatbot_route_total": ("counter", "Messages handled by each enhanced route"),
+    "chatbot_fallback_total": ("counter", "Messages that fell through to a fallback, by reason"),
+    "chatbot_typo_corrections_total": ("counter", "Unmatched messages retried with misspelled keywords corrected"),
+    "chatbot_classifier_total": ("counter", "Unmatched messages scored by the intent classifier, by result"),
+    "chatbot_response_cache_total": ("counter", "Response cache lookups of cacheable routes, by result"),
+}
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in the Prometheus style"""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(STAGE_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(STAGE_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class Metrics:
+    """Counters and per-stage latency histograms for the hot path.
+
+    Disabled by default (set FITNESS_BOT_METRICS=1 or call enable()).
+    Call sites do `start = metrics.start()` and `metrics.observe(stage,
+    start)`; while disabled start() returns None and observe() returns
+    straight away, so the only cost is two cheap calls per stage.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[Tuple[str, str, str], int] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def start(self) -> Optional[float]:
+        return time.perf_counter() if self.enabled else None
+
+    def observe(self, stage: str, start: Optional[float]):
+        """Record the time since start() under the given stage"""
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(elapsed)
+
+    def inc(self, name: str, label: str = "", value: str = ""):
+        """Increment a counter, optionally for one label value"""
+        if not self.enabled:
+            return
+        key = (name, label, value)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict:
+        """Plain-dict copy of everything recorded so far"""
+        with self._lock:
+            return {
+                "stages": {stage: {"count": h.count, "sum": h.total, "buckets": list(h.counts)}
+                           for stage, h in self._histograms.items()},
+                "counters": dict(self._counters),
+            }
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                for stage, data in sorted(snapshot["stages"].items()):
+                    cumulative = 0
+                    for bound, count in zip(STAGE_BUCKETS + ("+Inf",), data["buckets"]):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{stage="{stage}"}} {data["sum"]:.9f}')
+                    lines.append(f'{name}_count{{stage="{stage}"}} {data["count"]}')
+                continue
+            for (counter, label, value), count in sorted(snapshot["counters"].items()):
+                if counter != name:
+                    continue
+                labels = f'{{{label}="{value}"}}' if label else ""
+                lines.append(f"{name}{labels} {count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(enabled=os.environ.get("FITNESS_BOT_METRICS", "0") not in ("", "0", "false"))
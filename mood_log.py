@@ -0,0 +1,74 @@
+import datetime
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+class MoodLog:
+    """Columnar, append-only mood history.
+
+    Each entry costs a few bytes: the date is stored as an ordinal in an
+    int array, and the mood and suggested activity as small interned
+    codes. Queries run as NumPy aggregations over the columns instead of
+    walking a list of dicts.
+    """
+
+    def __init__(self):
+        self.dates = array("i")
+        self.moods = array("H")
+        self.activities = array("H")
+        self.mood_names: List[str] = []
+        self.activity_names: List[str] = []
+        self._mood_codes: Dict[str, int] = {}
+        self._activity_codes: Dict[str, int] = {}
+
+    @staticmethod
+    def _intern(value: str, names: List[str], codes: Dict[str, int]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def log(self, date: datetime.date, mood: str, activity: str):
+        self.dates.append(date.toordinal())
+        self.moods.append(self._intern(mood, self.mood_names, self._mood_codes))
+        self.activities.append(self._intern(activity, self.activity_names, self._activity_codes))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Yield entries in the old mood_history dict format"""
+        for ordinal, mood, activity in zip(self.dates, self.moods, self.activities):
+            yield {
+                "date": datetime.date.fromordinal(ordinal).strftime("%Y-%m-%d"),
+                "mood": self.mood_names[mood],
+                "activity_suggested": self.activity_names[activity]
+            }
+
+    def _columns(self):
+        import numpy as np  # only needed for queries, keep it off the import path
+        return (np, np.frombuffer(self.dates, dtype=np.intc),
+                np.frombuffer(self.moods, dtype=np.ushort))
+
+    def mood_counts(self, days: int = 30, today: Optional[datetime.date] = None) -> Dict[str, int]:
+        """Count each mood logged in the last `days` days (including today)"""
+        np, dates, moods = self._columns()
+        end = (today or datetime.date.today()).toordinal()
+        in_range = (dates > end - days) & (dates <= end)
+        counts = np.bincount(moods[in_range], minlength=len(self.mood_names))
+        return {self.mood_names[code]: int(count) for code, count in enumerate(counts) if count}
+
+    def most_frequent_by_weekday(self) -> Dict[str, str]:
+        """Most frequently logged mood for each weekday that has entries"""
+        np, dates, moods = self._columns()
+        n_moods = len(self.mood_names)
+        if not n_moods:
+            return {}
+        # Ordinal 1 (0001-01-01) was a Monday
+        weekdays = (dates - 1) % 7
+        table = np.bincount(weekdays * n_moods + moods, minlength=7 * n_moods).reshape(7, n_moods)
+        best = table.argmax(axis=1)
+        return {WEEKDAYS[day]: self.mood_names[best[day]] for day in range(7) if table[day].any()}
@@ -0,0 +1,281 @@
+import atexit
+import copy
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+from dataclasses import fields
+from typing import Dict, Optional, Tuple
+
+from activity_log import ActivityLog
+from enhanced_bot import UserProfile
+from mood_log import MoodLog
+
+logger = logging.getLogger(__name__)
+
+# Profile fields stored outside the JSON blob
+_SEPARATE_FIELDS = ("user_id", "mood_history")
+
+# One shared connection (and the lock that serializes it) per database
+# file per process. Keyed by pid so a forked worker opens its own.
+_connections: Dict[Tuple[int, str], Tuple[sqlite3.Connection, threading.Lock]] = {}
+_connections_lock = threading.Lock()
+
+
+def get_connection(path: str) -> Tuple[sqlite3.Connection, threading.Lock]:
+    key = (os.getpid(), os.path.abspath(path))
+    with _connections_lock:
+        if key not in _connections:
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS profiles (
+                    user_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS moods (
+                    user_id TEXT NOT NULL,
+                    date INTEGER NOT NULL,
+                    mood TEXT NOT NULL,
+                    activity TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS moods_user ON moods (user_id, date);
+            """)
+            _connections[key] = (conn, threading.Lock())
+        return _connections[key]
+
+
+class ProfileStore:
+    """SQLite-backed UserProfile storage with write-behind batching.
+
+    save() only records the profile as dirty; a background thread writes
+    every dirty profile in one transaction each `flush_interval` seconds,
+    or sooner once `batch_size` profiles are waiting. Messages therefore
+    never wait on the disk. Mood entries are append-only, so each flush
+    inserts just the entries added since the last one.
+
+    The store keeps one live profile object per user: load() hands every
+    session of a user the same object while any of them holds it, and
+    adopt() merges a profile moved in from another store into that
+    object instead of installing a second one. The count of saved mood
+    entries is kept together with the object it counts, so a profile the
+    store doesn't know never has its entries skipped. A failed flush puts
+    its batch back to be retried.
+    """
+
+    def __init__(self, path: str = "fitness_bot.db", flush_interval: float = 5.0,
+                 batch_size: int = 100):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._conn, self._conn_lock = get_connection(path)
+        self._lock = threading.Lock()
+        # Serializes flushes so mood rows are never written twice
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, UserProfile] = {}
+        # user_id -> (that user's profile object, how many of its mood entries are stored)
+        self._saved_moods: Dict[str, Tuple["weakref.ref[UserProfile]", int]] = {}
+        # user_id -> the profile object sessions currently share
+        self._live: "weakref.WeakValueDictionary[str, UserProfile]" = weakref.WeakValueDictionary()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+
+    def load(self, user_id: str) -> UserProfile:
+        """Return the user's live profile, else the stored one, else a fresh one"""
+        with self._lock:
+            profile = self._resident(user_id)
+            if profile is not None:
+                return profile
+
+        with self._conn_lock:
+            row = self._conn.execute(
+                "SELECT data FROM profiles WHERE user_id = ?", (user_id,)).fetchone()
+        mood_history = self._read_moods(user_id)
+
+        known = {f.name for f in fields(UserProfile)} - set(_SEPARATE_FIELDS)
+        data = json.loads(row[0]) if row else {}
+        profile = UserProfile(user_id=user_id, **{k: v for k, v in data.items() if k in known})
+        profile.mood_history = mood_history
+        with self._lock:
+            # Another session may have loaded the user meanwhile; share its object
+            live = self._resident(user_id)
+            if live is None:
+                live = self._live[user_id] = profile
+                self._saved_moods[user_id] = (weakref.ref(profile), len(mood_history))
+        return live
+
+    def adopt(self, profile: UserProfile) -> UserProfile:
+        """Take over a profile loaded by another store (e.g. moved from another process).
+
+        Its mood entries must be stored already (the other store flushed
+        them). Returns the object sessions must use from now on: the
+        profile itself, or, if this store already holds the user, that
+        resident object with the incoming profile merged in. The resident
+        object's unsaved changes are flushed first, and its mood history
+        is then re-read so it holds both stores' entries.
+        """
+        user_id = profile.user_id
+        with self._lock:
+            live = self._resident(user_id)
+            if live is None or live is profile:
+                self._live[user_id] = profile
+                self._saved_moods[user_id] = (weakref.ref(profile), len(profile.mood_history))
+                return profile
+
+        # Same lock order as flush(): no turn may log a mood between the
+        # flush and re-reading the history
+        with self._flush_lock, live.lock:
+            self._flush_pending()
+            _merge_profile(live, profile)
+            live.mood_history = self._read_moods(user_id)
+            with self._lock:
+                self._live[user_id] = live
+                self._saved_moods[user_id] = (weakref.ref(live), len(live.mood_history))
+            self.save(live)
+        return live
+
+    def _resident(self, user_id: str) -> Optional[UserProfile]:
+        """The user's profile object this store currently holds, if any; needs self._lock"""
+        profile = self._live.get(user_id)
+        return profile if profile is not None else self._pending.get(user_id)
+
+    def _saved_count(self, profile: UserProfile) -> int:
+        """Mood entries of this profile object already stored; needs self._lock"""
+        ref, count = self._saved_moods.get(profile.user_id, (None, 0))
+        return count if ref is not None and ref() is profile else 0
+
+    def _read_moods(self, user_id: str) -> MoodLog:
+        with self._conn_lock:
+            rows = self._conn.execute(
+                "SELECT date, mood, activity FROM moods WHERE user_id = ? ORDER BY rowid",
+                (user_id,)).fetchall()
+        mood_history = MoodLog()
+        for ordinal, mood, activity in rows:
+            mood_history.log(datetime.date.fromordinal(ordinal), mood, activity)
+        return mood_history
+
+    def save(self, profile: UserProfile):
+        """Queue the profile to be written on the next flush"""
+        if profile.user_id is None:
+            raise ValueError("Only profiles with a user_id can be saved")
+        with self._lock:
+            self._pending[profile.user_id] = profile
+            if self._thread is None:
+                self._start_flusher()
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+
+    def flush(self):
+        """Write every pending profile in a single transaction.
+
+        If the write fails the batch is queued again and the error raised.
+        """
+        with self._flush_lock:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        # Needs self._flush_lock
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        saved_before: Dict[str, Tuple] = {}
+        try:
+            self._write(pending, saved_before)
+        except Exception:
+            with self._lock:
+                for user_id, profile in pending.items():
+                    self._pending.setdefault(user_id, profile)
+                self._saved_moods.update(saved_before)
+            raise
+
+    def _write(self, pending: Dict[str, UserProfile], saved_before: Dict[str, Tuple]):
+        profile_rows = []
+        mood_rows = []
+        for user_id, profile in pending.items():
+            # Snapshot under the profile's lock so a turn can't change it
+            # half-way through. Turns take the profile lock before the
+            # store's, so self._lock must not be held here.
+            with profile.lock:
+                data = {f.name: getattr(profile, f.name) for f in fields(profile)
+                        if f.name not in _SEPARATE_FIELDS}
+                data["activity"] = profile.activity_ordinals()
+                profile_rows.append((user_id, json.dumps(data)))
+                log = profile.mood_history
+                with self._lock:
+                    first = self._saved_count(profile)
+                    if user_id in self._saved_moods:
+                        saved_before[user_id] = self._saved_moods[user_id]
+                    self._saved_moods[user_id] = (weakref.ref(profile), len(log))
+                for i in range(first, len(log)):
+                    mood_rows.append((user_id, log.dates[i], log.mood_names[log.moods[i]],
+                                      log.activity_names[log.activities[i]]))
+
+        with self._conn_lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO profiles (user_id, data) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data", profile_rows)
+            self._conn.executemany(
+                "INSERT INTO moods (user_id, date, mood, activity) VALUES (?, ?, ?, ?)", mood_rows)
+
+    def _start_flusher(self):
+        self._thread = threading.Thread(target=self._flush_loop, name="profile-store-flusher",
+                                        daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Profile flush failed; retrying in %s s", self.flush_interval)
+
+    def close(self):
+        """Stop the background flusher and write anything still pending"""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+
+def _merge_profile(live: UserProfile, incoming: UserProfile):
+    """Fold another copy of the same user's profile into the live one.
+
+    The incoming copy's settings win; activity logs, exercises and goals
+    are combined and the streaks recounted. Mood history is left to the
+    caller.
+    """
+    for name in ("energy_level", "available_time", "equipment", "fitness_level", "budget_range"):
+        setattr(live, name, copy.deepcopy(getattr(incoming, name)))
+    for name in ("preferred_exercises", "goals"):
+        items = getattr(live, name)
+        items.extend(item for item in getattr(incoming, name) if item not in items)
+    for kind, log in incoming.activity.items():
+        mine = live.activity.get(kind)
+        live.activity[kind] = ActivityLog(log.dates + mine.dates if mine is not None else log.dates)
+    if "workout" in live.activity:
+        live.workout_streak = live.activity["workout"].current
+    if "nutrition" in live.activity:
+        live.nutrition_streak = live.activity["nutrition"].current
+    live.last_workout_date = max(filter(None, (live.last_workout_date, incoming.last_workout_date)),
+                                 default=None)
+
+
+_profile_store = None
+
+
+def get_profile_store() -> ProfileStore:
+    """Process-wide ProfileStore, opened on first use"""
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = ProfileStore(os.environ.get("FITNESS_BOT_DB", "fitness_bot.db"))
+    return _profile_store
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Bulk N-day workout plans for many users at once
+
+    generator = PlanGenerator()
+    with open("plans.jsonl", "w") as out:
+        generator.write(rows_from_profiles(profiles), out, days=7, seed=1)
+
+Applies the intensity and time rules of
+EnhancedFitnessBot.generate_dynamic_workout, but samples every user's
+exercises (and variations of their preferred exercises) for a whole
+chunk of users in a few NumPy operations over integer-encoded tables.
+Plans are written as one JSON line per user; write() hands finished
+chunks to a writer thread while later chunks are still being sampled.
+Run this file to time a synthetic user base.
+"""
+
+import argparse
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from content import Catalog, get_content_store
+
+# Finished chunks that may wait for the writer thread
+WRITE_AHEAD = 2
+
+# Same thresholds as generate_dynamic_workout
+INTENSITIES = ["Low", "Moderate", "High"]
+TIME_RULES = [(10, "Quick Burst", "30 seconds each"),
+              (20, "Express", "45 seconds each, 15s rest"),
+              (None, "Full", "3 sets of 12-15 reps")]
+
+# (user_id, energy_level, available_time, preferred_exercises)
+PlanRow = Tuple[str, int, int, Sequence[str]]
+
+
+def rows_from_profiles(profiles: Iterable) -> Iterator[PlanRow]:
+    """Plan input rows for UserProfile objects"""
+    for profile in profiles:
+        yield profile.user_id, profile.energy_level, profile.available_time, profile.preferred_exercises
+
+
+def rows_from_db(path: str) -> Iterator[PlanRow]:
+    """Plan input rows for every profile in a persistence.ProfileStore database.
+
+    Reads only the fields a plan needs from each JSON blob, without
+    building UserProfile objects.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        for user_id, data in conn.execute("SELECT user_id, data FROM profiles"):
+            fields = json.loads(data)
+            yield (user_id, fields.get("energy_level", 5), fields.get("available_time", 30),
+                   fields.get("preferred_exercises", ()))
+    finally:
+        conn.close()
+
+
+class PlanGenerator:
+    """Integer-encoded exercise tables for one catalog, and the sampler over them.
+
+    Every exercise name (from the intensity lists and the variation
+    table) gets an id; labels are the exercise names followed by one
+    "<variation> (variation of <exercise>)" entry per variation, already
+    JSON-encoded for output.
+    """
+
+    def __init__(self, catalog: Optional[Catalog] = None):
+        catalog = catalog or get_content_store().current
+        names: List[str] = []
+        for intensity in INTENSITIES:
+            names.extend(catalog.workout_exercises[intensity.lower()])
+        names.extend(catalog.workout_variations)
+        self.exercises = list(dict.fromkeys(names))
+        self.exercise_ids = {name: index for index, name in enumerate(self.exercises)}
+
+        # intensity -> padded row of exercise ids, and how many are real
+        lists = [catalog.workout_exercises[intensity.lower()] for intensity in INTENSITIES]
+        self.choice_counts = np.array([len(names) for names in lists], dtype=np.int64)
+        self.choices = np.zeros((len(lists), self.choice_counts.max()), dtype=np.int64)
+        for row, names in enumerate(lists):
+            self.choices[row, :len(names)] = [self.exercise_ids[name] for name in names]
+
+        # exercise id -> label id of its first variation, and how many it has
+        labels = list(self.exercises)
+        self.variation_counts = np.zeros(len(self.exercises), dtype=np.int64)
+        self.variation_offsets = np.zeros(len(self.exercises), dtype=np.int64)
+        for exercise, variations in catalog.workout_variations.items():
+            exercise_id = self.exercise_ids[exercise]
+            self.variation_counts[exercise_id] = len(variations)
+            self.variation_offsets[exercise_id] = len(labels)
+            labels.extend(f"{variation} (variation of {exercise})" for variation in variations)
+        self.labels = labels
+        self._json_labels = [json.dumps(label, ensure_ascii=False) for label in labels]
+        self._json_headers = [
+            (json.dumps(intensity), json.dumps(workout_type), json.dumps(reps))
+            for intensity in INTENSITIES for _, workout_type, reps in TIME_RULES]
+
+    def encode(self, rows: Sequence[PlanRow]):
+        """(energy, minutes, preferred) arrays for a chunk of rows"""
+        energy = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+        minutes = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+        preferred = np.zeros((len(rows), len(self.exercises)), dtype=bool)
+        ids = self.exercise_ids
+        for index, row in enumerate(rows):
+            for name in row[3]:
+                exercise_id = ids.get(name)
+                if exercise_id is not None:
+                    preferred[index, exercise_id] = True
+        return energy, minutes, preferred
+
+    def sample(self, energy: np.ndarray, minutes: np.ndarray, preferred: np.ndarray, days: int,
+               rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sample plans for a chunk of users.
+
+        Returns (intensity index, time rule index, label ids of shape
+        (users, days)).
+        """
+        intensity = np.where(energy <= 4, 0, np.where(energy >= 7, 2, 1))
+        time_rule = np.where(minutes <= 10, 0, np.where(minutes <= 20, 1, 2))
+
+        # One uniformly chosen exercise per day from the user's intensity list
+        slots = (rng.random((len(energy), days)) * self.choice_counts[intensity][:, None]).astype(np.int64)
+        exercise = self.choices[intensity[:, None], slots]
+
+        # Preferred exercises that have variations are swapped for a random one
+        counts = self.variation_counts[exercise]
+        vary = preferred[np.arange(len(energy))[:, None], exercise] & (counts > 0)
+        picks = (rng.random(exercise.shape) * counts).astype(np.int64)
+        labels = np.where(vary, self.variation_offsets[exercise] + picks, exercise)
+        return intensity, time_rule, labels
+
+    def iter_lines(self, rows: Iterable[PlanRow], days: int = 7, seed: Optional[int] = None,
+                   chunk_size: int = 65536) -> Iterator[str]:
+        """One JSON line per user; the same rows and seed always give the same plans"""
+        rng = np.random.default_rng(seed)
+        rows = iter(rows)
+        while True:
+            chunk = [row for _, row in zip(range(chunk_size), rows)]
+            if not chunk:
+                return
+            intensity, time_rule, labels = self.sample(*self.encode(chunk), days, rng)
+            headers = (intensity * len(TIME_RULES) + time_rule).tolist()
+            json_labels, json_headers = self._json_labels, self._json_headers
+            for row, header, day_labels in zip(chunk, headers, labels.tolist()):
+                intensity_json, type_json, reps_json = json_headers[header]
+                yield (f'{{"user_id": {json.dumps(row[0])}, "intensity": {intensity_json}, '
+                       f'"workout_type": {type_json}, "minutes": {int(row[2])}, "reps": {reps_json}, '
+                       f'"days": [{", ".join([json_labels[label] for label in day_labels])}]}}\n')
+
+    def write(self, rows: Iterable[PlanRow], out: IO[str], days: int = 7, seed: Optional[int] = None,
+              chunk_size: int = 65536) -> int:
+        """Stream plans to `out`; returns the number of users written.
+
+        A writer thread writes each finished chunk while the next one is
+        sampled; at most WRITE_AHEAD chunks wait in between.
+        """
+        chunks: "queue.Queue[Optional[str]]" = queue.Queue(WRITE_AHEAD)
+        failure: List[BaseException] = []
+
+        def writer():
+            while True:
+                text = chunks.get()
+                if text is None:
+                    return
+                if not failure:
+                    try:
+                        out.write(text)
+                    except BaseException as e:
+                        failure.append(e)
+
+        thread = threading.Thread(target=writer, name="plan-writer", daemon=True)
+        thread.start()
+        written = 0
+        try:
+            lines = self.iter_lines(rows, days, seed, chunk_size)
+            while not failure:
+                chunk = list(islice(lines, chunk_size))
+                if not chunk:
+                    break
+                chunks.put("".join(chunk))
+                written += len(chunk)
+        finally:
+            chunks.put(None)
+            thread.join()
+        if failure:
+            raise failure[0]
+        return written
+
+
+def synthetic_rows(users: int, seed: int = 0) -> Iterator[PlanRow]:
+    """Random profiles covering every intensity, time rule and preference"""
+    rng = np.random.default_rng(seed)
+    generator_exercises = PlanGenerator().exercises
+    energy = rng.integers(1, 11, users).tolist()
+    minutes = rng.choice([5, 10, 15, 20, 30, 45, 60], users).tolist()
+    favourites = rng.integers(0, len(generator_exercises), users).tolist()
+    for index in range(users):
+        preferred = (generator_exercises[favourites[index]],) if index % 3 else ()
+        yield f"user-{index}", energy[index], minutes[index], preferred
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate N-day workout plans for many users")
+    parser.add_argument("--db", help="profile database to plan for (default: synthetic users)")
+    parser.add_argument("--users", type=int, default=1_000_000, help="synthetic users to generate")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default="-", help="JSONL file to write ('-' for stdout)")
+    args = parser.parse_args()
+
+    rows = rows_from_db(args.db) if args.db else synthetic_rows(args.users)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        written = PlanGenerator().write(rows, out, args.days, args.seed)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"✅ {written} {args.days}-day plans in {elapsed:.2f}s ({written / max(elapsed, 1e-9):,.0f} users/s)",
+          file=sys.stderr)
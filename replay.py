@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Deterministic record/replay harness for chatbot sessions
+
+    recorder = SessionRecorder("session.jsonl")
+    recorder.respond("I'm tired, quick workout")
+    ...
+    python replay.py session.jsonl
+
+A recording stores the bot's RNG seed, the starting profile and, for each
+turn, the clock snapshot, message and response. Replaying feeds the same
+times and seed back in, checks every response is byte-identical and
+reports timings for both runs.
+"""
+
+import argparse
+import datetime
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from chatbot import respond
+from enhanced_bot import EnhancedFitnessBot, UserProfile
+
+
+class FixedClock:
+    """Clock that returns whatever time it was last set to"""
+
+    def __init__(self, now: Optional[datetime.datetime] = None):
+        self.current = now or datetime.datetime.now()
+
+    def set(self, now: datetime.datetime):
+        self.current = now
+
+    def __call__(self) -> datetime.datetime:
+        return self.current
+
+
+class SessionRecorder:
+    """Runs a session through the engine and records every turn to a JSONL file"""
+
+    def __init__(self, path: str, profile: Optional[UserProfile] = None,
+                 seed: Optional[int] = None, **bot_options):
+        self.path = path
+        self.profile = profile or UserProfile()
+        self.bot = EnhancedFitnessBot(seed=seed, **bot_options)
+        self._real_clock = self.bot.clock
+        self._last_time = None
+        self.bot.clock = self._clock
+        self._file = open(path, "w", encoding="utf-8")
+        self._write({"type": "session", "seed": self.bot.seed, "profile": self.profile.to_dict()})
+
+    def _clock(self) -> datetime.datetime:
+        self._last_time = self._real_clock()
+        return self._last_time
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def respond(self, message: str) -> str:
+        self._last_time = None
+        start = time.perf_counter()
+        response, intent = respond(message, self.bot, self.profile)
+        elapsed = time.perf_counter() - start
+        # The clock isn't read when no enhanced handler runs
+        turn_time = self._last_time or self._real_clock()
+        self._write({
+            "type": "turn",
+            "time": turn_time.isoformat(),
+            "message": message,
+            "response": response,
+            "intent": intent,
+            "elapsed_ms": elapsed * 1000
+        })
+        return response
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@dataclass
+class TurnResult:
+    message: str
+    recorded: str
+    replayed: str
+    recorded_ms: float
+    replayed_ms: float
+
+    @property
+    def identical(self) -> bool:
+        return self.recorded.encode("utf-8") == self.replayed.encode("utf-8")
+
+
+@dataclass
+class ReplayReport:
+    turns: List[TurnResult] = field(default_factory=list)
+
+    @property
+    def mismatches(self) -> List[TurnResult]:
+        return [turn for turn in self.turns if not turn.identical]
+
+    def summary(self) -> str:
+        recorded = sum(turn.recorded_ms for turn in self.turns)
+        replayed = sum(turn.replayed_ms for turn in self.turns)
+        lines = [
+            f"Turns: {len(self.turns)}, identical: {len(self.turns) - len(self.mismatches)}/{len(self.turns)}",
+            f"Recorded time: {recorded:.2f} ms total, replay time: {replayed:.2f} ms total",
+        ]
+        for turn in self.mismatches:
+            lines.append(f"❌ {turn.message!r}\n   recorded: {turn.recorded!r}\n   replayed: {turn.replayed!r}")
+        return "\n".join(lines)
+
+
+def replay(path: str, **bot_options) -> ReplayReport:
+    """Re-execute a recorded session with the same clock and seed"""
+    report = ReplayReport()
+    clock = FixedClock()
+    bot = profile = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["type"] == "session":
+                bot = EnhancedFitnessBot(clock=clock, seed=record["seed"], **bot_options)
+                profile = UserProfile.from_dict(record["profile"])
+                continue
+            clock.set(datetime.datetime.fromisoformat(record["time"]))
+            start = time.perf_counter()
+            response, _ = respond(record["message"], bot, profile)
+            elapsed = time.perf_counter() - start
+            report.turns.append(TurnResult(record["message"], record["response"], response,
+                                           record["elapsed_ms"], elapsed * 1000))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded chatbot session")
+    parser.add_argument("recording", help="JSONL file written by SessionRecorder")
+    args = parser.parse_args()
+
+    result = replay(args.recording)
+    print(result.summary())
+    sys.exit(1 if result.mismatches else 0)
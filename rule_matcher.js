@@ -0,0 +1,90 @@
+/*
+ * Client-side port of chatbot.get_rule_response() over rules.json
+ * (written by export_rules.py). index.html answers with it in the
+ * browser; check_rule_parity.py runs it under Node against the Python
+ * matcher.
+ */
+(function (root) {
+    'use strict';
+
+    // Python's \s (str.isspace) and \w (letters, numbers, underscore)
+    const SPACE = '\\t\\n\\v\\f\\r\\x1c-\\x20\\x85\\xa0\\u1680\\u2000-\\u200a\\u2028\\u2029\\u202f\\u205f\\u3000';
+    const NON_WORD = new RegExp(`[^\\p{L}\\p{N}_${SPACE}]`, 'gu');
+    const WORD = /[\p{L}\p{N}_]+/gu;
+    const SPLIT = new RegExp(`[${SPACE}]+`, 'u');
+
+    // chatbot.clean_input
+    function cleanInput(userInput) {
+        return userInput.toLowerCase().replace(NON_WORD, '');
+    }
+
+    class RuleMatcher {
+        constructor(artifact) {
+            this.rules = artifact.rules;
+            this.defaultRule = artifact.default;
+            this.transitions = artifact.transitions;
+            this.intent = null;
+            this.trie = new Map();
+            this.rules.forEach((rule, ruleIndex) => {
+                for (const phrase of rule.phrases) this.addPhrase(phrase, ruleIndex);
+            });
+        }
+
+        addPhrase(phrase, ruleIndex) {
+            let node = this.trie;
+            for (const word of phrase.split(' ')) {
+                if (!node.has(word)) node.set(word, new Map());
+                node = node.get(word);
+            }
+            // A phrase listed in several rules only needs the earliest one
+            if (!node.has(null)) node.set(null, ruleIndex);
+        }
+
+        // IntentMatcher.match: the earliest rule with a phrase in the message
+        match(cleanedInput) {
+            const words = [...cleanedInput.matchAll(WORD)].map(m => [m.index, m.index + m[0].length, m[0]]);
+            let best = -1;
+            for (let i = 0; i < words.length; i++) {
+                let node = this.trie.get(words[i][2]);
+                let j = i;
+                while (node !== undefined) {
+                    const end = words[j][1];
+                    if (node.has(null) && (best < 0 || node.get(null) < best)) best = node.get(null);
+                    j++;
+                    // Multi-word phrases are separated by exactly one space
+                    if (j === words.length || words[j][0] !== end + 1 || cleanedInput[end] !== ' ') break;
+                    node = node.get(words[j][2]);
+                }
+            }
+            return best < 0 ? null : this.rules[best];
+        }
+
+        // DialogueState.follow_up
+        followUp(cleanedInput) {
+            if (!Object.prototype.hasOwnProperty.call(this.transitions, this.intent)) return null;
+            const words = new Set(cleanedInput.split(SPLIT));
+            for (const [triggers, response, intent] of this.transitions[this.intent]) {
+                if (triggers.some(trigger => words.has(trigger))) return { response, intent };
+            }
+            return null;
+        }
+
+        // chatbot.get_rule_response: a follow-up, then a rule, then the default
+        respond(userInput) {
+            const cleaned = cleanInput(userInput);
+            const answer = this.followUp(cleaned) || this.match(cleaned) || this.defaultRule;
+            this.intent = answer.intent;
+            return { response: answer.response, intent: answer.intent };
+        }
+
+        reset() {
+            this.intent = null;
+        }
+    }
+
+    if (typeof module !== 'undefined' && module.exports) {
+        module.exports = { RuleMatcher, cleanInput };
+    } else {
+        root.RuleMatcher = RuleMatcher;
+    }
+})(this);
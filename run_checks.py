@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Run every correctness check before sending a change
+
+    python run_checks.py
+    python run_checks.py --only stress_sessions
+
+Each check is one of the verification scripts, run in its own process;
+a check fails when its script exits non-zero. Timing benchmarks other
+than the import budget are left out because they depend on the machine.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# (script, arguments, tool it needs besides Python)
+CHECKS = [
+    ("demo_features.py", [], None),
+    ("benchmark_import.py", ["--budget-ms", "100"], None),
+    ("stress_sessions.py", ["--sessions", "300", "--threads", "32"], None),
+    ("check_route_parity.py", [], None),
+    ("export_rules.py", ["--check"], None),
+    ("check_rule_parity.py", [], "node"),
+]
+
+
+def run_check(script: str, arguments) -> bool:
+    result = subprocess.run([sys.executable, os.path.join(ROOT, script)] + list(arguments), cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode:
+        print((result.stdout + result.stderr).strip()[-2000:])
+    return result.returncode == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the repository's verification scripts")
+    parser.add_argument("--only", nargs="*", help="check names (script without .py) to run")
+    args = parser.parse_args()
+
+    failed = []
+    for script, arguments, tool in CHECKS:
+        name = script[:-3]
+        if args.only and name not in args.only:
+            continue
+        if tool and shutil.which(tool) is None:
+            print(f"⏭️  {name}: skipped ({tool} not installed)")
+            continue
+        start = time.perf_counter()
+        ok = run_check(script, arguments)
+        print(f"{'✅' if ok else '❌'} {name} ({time.perf_counter() - start:.1f} s)")
+        if not ok:
+            failed.append(name)
+    if failed:
+        print(f"{len(failed)} checks failed: {', '.join(failed)}")
+        sys.exit(1)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Lightweight asyncio JSON HTTP front-end for the chatbot engine
+
+    python server.py --port 8000
+    curl -X POST localhost:8000/chat -d '{"session_id": "abc", "message": "hi"}'
+    curl localhost:8000/metrics
+
+Uses only the standard library, so it runs locally with no external services.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple, Union
+
+from chatbot import respond
+from errors import WorkerError
+from metrics import metrics
+from sessions import SessionManager
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_HEADER_LINES = 100
+
+
+class ChatServer:
+    """Serves POST /chat, GET /health and GET /metrics on top of a SessionManager.
+
+    Response generation runs in a bounded thread pool so the event loop
+    never stalls on CPU work. At most `max_pending` chat requests are in
+    flight at once; beyond that the server answers 503 instead of
+    queueing without limit. Messages of one session are handled one at a
+    time so its bot and profile never see concurrent updates.
+
+    With a worker_pool.ShardedPool the messages are forwarded to worker
+    processes instead, which own the sessions and keep them in order.
+    """
+
+    def __init__(self, session_manager: Optional[SessionManager] = None, workers: int = 4,
+                 max_pending: int = 256, pool=None):
+        self.pool = pool
+        if session_manager is None and pool is None:
+            session_manager = SessionManager()
+        self.session_manager = session_manager
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chat-worker")
+        self.max_pending = max_pending
+        self._pending = 0
+        # session id -> [lock, number of requests using it]
+        self._session_locks: Dict[str, list] = {}
+
+    async def chat(self, payload: Dict) -> Tuple[int, Dict]:
+        session_id = payload.get("session_id")
+        message = payload.get("message")
+        if not isinstance(session_id, str) or not isinstance(message, str):
+            return HTTPStatus.BAD_REQUEST, {"error": "'session_id' and 'message' must be strings"}
+        user_id = payload.get("user_id")
+        if self._pending >= self.max_pending:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "server busy, retry later"}
+
+        self._pending += 1
+        try:
+            if self.pool is not None:
+                response, intent = await asyncio.wrap_future(self.pool.submit(session_id, message, user_id))
+            else:
+                response, intent = await self._respond_locally(session_id, user_id, message)
+        except WorkerError as e:
+            logger.warning("Worker failed for session %s: %s", session_id, e)
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "worker unavailable, retry later"}
+        except Exception:
+            logger.exception("Chat request failed for session %s", session_id)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}
+        finally:
+            self._pending -= 1
+        return HTTPStatus.OK, {"session_id": session_id, "response": response, "intent": intent}
+
+    async def _respond_locally(self, session_id: str, user_id: Optional[str], message: str) -> Tuple[str, str]:
+        entry = self._session_locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, self._respond, session_id, user_id, message)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._session_locks[session_id]
+
+    def _respond(self, session_id: str, user_id: Optional[str], message: str) -> Tuple[str, str]:
+        bot, profile = self.session_manager.get(session_id, user_id)
+        return respond(message, bot, profile)
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Union[Dict, str]]:
+        if path == "/health":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use GET"}
+            if self.pool is not None:
+                return HTTPStatus.OK, {"status": "ok", "workers": self.pool.size,
+                                       "restarts": self.pool.restarts, "pending": self._pending}
+            return HTTPStatus.OK, {"status": "ok", "sessions": len(self.session_manager),
+                                   "pending": self._pending}
+        if path == "/metrics":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use GET"}
+            return HTTPStatus.OK, metrics.to_prometheus()
+        if path == "/chat":
+            if method != "POST":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use POST"}
+            try:
+                payload = json.loads(body or b"{}")
+            except (ValueError, UnicodeDecodeError):
+                return HTTPStatus.BAD_REQUEST, {"error": "body must be JSON"}
+            if not isinstance(payload, dict):
+                return HTTPStatus.BAD_REQUEST, {"error": "body must be a JSON object"}
+            return await self.chat(payload)
+        return HTTPStatus.NOT_FOUND, {"error": f"no route for {path}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._write(writer, HTTPStatus.BAD_REQUEST, {"error": "bad request line"}, False)
+                    break
+
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close")
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._write(writer, HTTPStatus.BAD_REQUEST, {"error": "bad Content-Length"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                      {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, payload = await self.dispatch(method, path.split("?", 1)[0], body)
+                except Exception:
+                    logger.exception("Error while handling %s %s", method, path)
+                    status, payload, keep_alive = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}, False
+                await self._write(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except Exception:
+            logger.exception("Error while handling request")
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, status: int, payload: Union[Dict, str],
+                     keep_alive: bool):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        status = HTTPStatus(status)
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        logger.info("Serving on http://%s:%d", host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self.pool is not None:
+            self.pool.close()
+        else:
+            self.session_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fitness chatbot JSON HTTP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4, help="threads generating responses")
+    parser.add_argument("--max-pending", type=int, default=256,
+                        help="chat requests in flight before answering 503")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="shard sessions over this many worker processes; /metrics then "
+                             "only covers the front-end (default 0: answer in-process)")
+    parser.add_argument("--no-metrics", action="store_true",
+                        help="turn off stage timings and counters (GET /metrics stays empty)")
+    parser.add_argument("--db", help="SQLite file for durable profiles (default: in-memory only)")
+    parser.add_argument("--export-turns", help="append every conversation turn to this JSONL file "
+                                               "(one file per worker with --processes)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.no_metrics:
+        metrics.enable()
+    exporter = None
+    if args.processes:
+        from worker_pool import ShardedPool
+        chat_server = ChatServer(workers=args.workers, max_pending=args.max_pending,
+                                 pool=ShardedPool(args.processes, db=args.db, export_turns=args.export_turns))
+    else:
+        profile_store = None
+        if args.db:
+            from persistence import ProfileStore
+            profile_store = ProfileStore(args.db)
+        if args.export_turns:
+            from conversation_log import TurnExporter
+            exporter = TurnExporter(args.export_turns)
+        chat_server = ChatServer(SessionManager(profile_store=profile_store, turn_exporter=exporter),
+                                 args.workers, args.max_pending)
+    try:
+        asyncio.run(chat_server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        chat_server.close()
+        if exporter is not None:
+            exporter.close()
@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from enhanced_bot import EnhancedFitnessBot, UserProfile
+from persistence import get_profile_store
+
+
+@dataclass
+class Session:
+    bot: EnhancedFitnessBot
+    profile: UserProfile
+    last_seen: float
+
+
+class SessionManager:
+    """Headless registry of (bot, profile) pairs keyed by session id.
+
+    Sessions are kept in LRU order. A session idle for longer than `ttl`
+    seconds, or the least recently used one once `max_sessions` is
+    exceeded, is evicted; its profile is handed to the profile store (if
+    any) and then `on_evict` is called. With a `turn_exporter`
+    (conversation_log.TurnExporter) every turn of every session is
+    exported: turns dropping out of a session's memory as they go, the
+    rest when the session is evicted. Sessions moved away with detach()
+    take their unexported turns along (see adopt()). Nothing here
+    depends on Streamlit, so any front-end can host many users in one
+    process.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl: float = 1800.0, profile_store=None,
+                 memory_size: int = 50,
+                 on_evict: Optional[Callable[[str, Session], None]] = None,
+                 clock: Callable[[], float] = time.monotonic, turn_exporter=None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.profile_store = profile_store
+        self.memory_size = memory_size
+        self.on_evict = on_evict
+        self.turn_exporter = turn_exporter
+        self.clock = clock
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, user_id: Optional[str] = None) -> Tuple[EnhancedFitnessBot, UserProfile]:
+        """Return the session's (bot, profile), creating it if needed"""
+        now = self.clock()
+        with self._lock:
+            evicted = self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_seen = now
+                self._sessions.move_to_end(session_id)
+        self._finish_evictions(evicted)
+        if session is not None:
+            return session.bot, session.profile
+
+        # Load outside the lock so a slow profile read doesn't block other sessions
+        session = self._create(session_id, user_id)
+        with self._lock:
+            session = self._sessions.setdefault(session_id, session)
+            session.last_seen = now
+            self._sessions.move_to_end(session_id)
+            evicted = []
+            while len(self._sessions) > self.max_sessions:
+                evicted.append(self._sessions.popitem(last=False))
+        self._finish_evictions(evicted)
+        return session.bot, session.profile
+
+    def _create(self, session_id: str, user_id: Optional[str]) -> Session:
+        if self.profile_store is not None and user_id is not None:
+            profile = self.profile_store.load(user_id)
+        else:
+            profile = UserProfile(user_id=user_id)
+        return Session(self._new_bot(session_id), profile, self.clock())
+
+    def _new_bot(self, session_id: str) -> EnhancedFitnessBot:
+        bot = EnhancedFitnessBot(memory_size=self.memory_size, profile_store=self.profile_store)
+        if self.turn_exporter is not None:
+            self.turn_exporter.attach(session_id, bot.conversation_memory)
+        return bot
+
+    def _expire(self, now: float):
+        # LRU order is also last_seen order, so expired sessions sit at the front
+        evicted = []
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_seen <= self.ttl:
+                break
+            evicted.append(self._sessions.popitem(last=False))
+        return evicted
+
+    def _finish_evictions(self, evicted):
+        for session_id, session in evicted:
+            if self.profile_store is not None and session.profile.user_id is not None:
+                self.profile_store.save(session.profile)
+            if self.turn_exporter is not None:
+                self.turn_exporter.export(session_id, session.bot.conversation_memory)
+            if self.on_evict is not None:
+                self.on_evict(session_id, session)
+
+    def evict(self, session_id: str) -> bool:
+        """Drop one session now; returns False if it wasn't loaded"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self._finish_evictions([(session_id, session)])
+        return True
+
+    def detach(self, session_id: str) -> Optional[Session]:
+        """Remove a session without evicting it, e.g. to move it to another process"""
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def adopt(self, session_id: str, profile: UserProfile, bot_state: Optional[Dict] = None):
+        """Install a session detached elsewhere; replaces any existing one.
+
+        bot_state is the old bot's EnhancedFitnessBot.export_state(), so the
+        conversation memory and follow-ups carry on; without it the session
+        keeps only its profile. The profile's stored mood entries must
+        already be flushed by the store it came from. If the store already
+        holds the user (another of their sessions lives here), the session
+        gets that profile with the moved one merged in, see
+        ProfileStore.adopt().
+        """
+        bot = self._new_bot(session_id)
+        if bot_state is not None:
+            bot.import_state(bot_state)
+        if self.profile_store is not None and profile.user_id is not None:
+            profile = self.profile_store.adopt(profile)
+        session = Session(bot, profile, self.clock())
+        with self._lock:
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            evicted = []
+            while len(self._sessions) > self.max_sessions:
+                evicted.append(self._sessions.popitem(last=False))
+        self._finish_evictions(evicted)
+
+    def session_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._sessions)
+
+    def items(self) -> List[Tuple[str, Session]]:
+        """Snapshot of (session_id, Session) pairs in LRU order"""
+        with self._lock:
+            return list(self._sessions.items())
+
+    def evict_idle(self):
+        """Evict every session idle longer than the TTL"""
+        with self._lock:
+            evicted = self._expire(self.clock())
+        self._finish_evictions(evicted)
+
+    def close(self):
+        """Evict every session, e.g. before shutting the process down"""
+        with self._lock:
+            evicted = list(self._sessions.items())
+            self._sessions.clear()
+        self._finish_evictions(evicted)
+        if self.profile_store is not None:
+            self.profile_store.flush()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+
+_session_manager = None
+
+
+def get_session_manager() -> SessionManager:
+    """Process-wide SessionManager backed by the default profile store"""
+    global _session_manager
+    if _session_manager is None:
+        _session_manager = SessionManager(profile_store=get_profile_store())
+    return _session_manager
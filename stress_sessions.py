@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for per-session state
+Serves many scripted sessions at once from a ThreadPoolExecutor (with a
+tiny thread switch interval to force interleaving) and checks that no
+session ever sees another one's dialogue state, profile values or mood
+entries. Also moves sessions between two profile stores, as a resize of
+the worker pool does, into a store already serving the same user, and
+checks that every user keeps one profile object and no mood row is lost
+or written twice. Exits with code 1 on the first kind of leak found.
+"""
+
+import argparse
+import os
+import pickle
+import sqlite3
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from chatbot import respond
+from dialogue import WORKOUT_FOLLOW_UPS
+from persistence import ProfileStore
+from sessions import SessionManager
+
+MOODS = ["stressed", "sad", "anxious", "angry", "excited"]
+
+
+def script_for(index: int) -> List[Tuple[str, str]]:
+    """(message, expected text in the response) for one session"""
+    minutes = 11 + index % 40
+    trigger, follow_up, _ = WORKOUT_FOLLOW_UPS[index % len(WORKOUT_FOLLOW_UPS)]
+    word = trigger[0]
+    turns = [(f"I have {minutes} minutes, give me a workout", f"({minutes} min)"),
+             (word, follow_up)]
+    if index % 2:
+        # After an unrelated turn the same word must get the plain rule answer
+        turns += [("thanks", "You're welcome"), (word, "")]
+    turns += [(f"I feel {MOODS[index % len(MOODS)]}", "Mood-based suggestion")] * (1 + index % 3)
+    return turns
+
+
+def run_session(manager: SessionManager, index: int) -> List[str]:
+    """Play one session's script; returns a description of every problem found"""
+    session_id = f"session-{index}"
+    problems = []
+    last_intent = None
+    for message, expected in script_for(index):
+        bot, profile = manager.get(session_id, f"user-{index}")
+        response, last_intent = respond(message, bot, profile)
+        if expected and expected not in response:
+            problems.append(f"{session_id}: {message!r} -> {response!r}, expected {expected!r}")
+        if not expected and any(response == follow_up for _, follow_up, _ in WORKOUT_FOLLOW_UPS):
+            problems.append(f"{session_id}: {message!r} got a follow-up after the topic changed")
+
+    bot, profile = manager.get(session_id, f"user-{index}")
+    minutes = 11 + index % 40
+    if profile.available_time != minutes:
+        problems.append(f"{session_id}: available_time {profile.available_time}, expected {minutes}")
+    if bot.dialogue.intent != last_intent:
+        problems.append(f"{session_id}: dialogue state {bot.dialogue.intent!r}, expected {last_intent!r}")
+    moods = [entry["mood"] for entry in profile.mood_history]
+    if moods != [MOODS[index % len(MOODS)]] * (1 + index % 3):
+        problems.append(f"{session_id}: mood history {moods}")
+    return problems
+
+
+def hammer_one_session(manager: SessionManager, executor: ThreadPoolExecutor, turns: int) -> List[str]:
+    """Many threads writing to the same session must not lose updates"""
+    bot, profile = manager.get("shared", "user-shared")
+    futures = [executor.submit(respond, "I feel stressed", bot, profile) for _ in range(turns)]
+    for future in futures:
+        future.result()
+    if len(profile.mood_history) != turns:
+        return [f"shared session: {len(profile.mood_history)} mood entries, expected {turns}"]
+    return []
+
+
+def move_session(source: SessionManager, target: SessionManager, session_id: str):
+    """Hand a session to another manager the way worker_pool does between processes"""
+    session = source.detach(session_id)
+    source.profile_store.save(session.profile)
+    source.profile_store.flush()
+    profile, bot_state = pickle.loads(pickle.dumps((session.profile, session.bot.export_state())))
+    target.adopt(session_id, profile, bot_state)
+
+
+def adopt_across_stores(db_path: str, users: int, executor: ThreadPoolExecutor) -> List[str]:
+    """Sessions moved into a store that already serves their user"""
+    stores = [ProfileStore(db_path, flush_interval=0.001) for _ in range(2)]
+    source, target = (SessionManager(max_sessions=2 * users, profile_store=store) for store in stores)
+
+    def play(index: int) -> List[str]:
+        user_id = f"mover-{index}"
+        moved, resident = f"moved-{index}", f"resident-{index}"
+        respond("I feel sad", *source.get(moved, user_id))
+        # Logged in the target but possibly not flushed when the move lands
+        respond("I feel angry", *target.get(resident, user_id))
+        move_session(source, target, moved)
+        for session_id in (moved, resident):
+            respond("I feel excited", *target.get(session_id, user_id))
+        profiles = {id(target.get(session_id, user_id)[1]) for session_id in (moved, resident)}
+        return [f"{user_id}: {len(profiles)} profile objects after the move"] if len(profiles) != 1 else []
+
+    problems = [problem for result in executor.map(play, range(users)) for problem in result]
+    for manager in (source, target):
+        manager.close()
+    for store in stores:
+        store.close()
+    with sqlite3.connect(db_path) as conn:
+        counts = dict(conn.execute("SELECT mood, COUNT(*) FROM moods GROUP BY mood"))
+    expected = {"sad": users, "angry": users, "excited": 2 * users}
+    if counts != expected:
+        problems.append(f"moved sessions: mood rows {counts}, expected {expected}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent session isolation stress test")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "stress.db")
+        # A fast background flush snapshots profiles while turns change them
+        store = ProfileStore(db_path, flush_interval=0.001)
+        manager = SessionManager(max_sessions=args.sessions + 1, profile_store=store)
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            for result in executor.map(lambda i: run_session(manager, i), range(args.sessions)):
+                problems.extend(result)
+            problems.extend(hammer_one_session(manager, executor, args.threads * 10))
+            problems.extend(adopt_across_stores(os.path.join(tmp, "moves.db"), max(args.sessions // 10, 1),
+                                                executor))
+        manager.close()
+        store.close()
+
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute("SELECT COUNT(*) FROM moods").fetchone()[0]
+        expected_rows = sum(1 + index % 3 for index in range(args.sessions)) + args.threads * 10
+        if rows != expected_rows:
+            problems.append(f"profile store: {rows} mood rows saved, expected {expected_rows}")
+
+    for problem in problems[:20]:
+        print(f"❌ {problem}")
+    if problems:
+        print(f"{len(problems)} problems found")
+        sys.exit(1)
+    print(f"✅ {args.sessions} concurrent sessions on {args.threads} threads stayed isolated")
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Multi-process worker pool with session affinity
+
+    pool = ShardedPool(workers=4)
+    response, intent = pool.respond("session-1", "quick workout")
+    pool.resize(8)
+    pool.close()
+
+Each session id is hashed to one worker process, so its bot and profile
+live in exactly one place and CPU-bound response generation spreads over
+all cores. Run this file to measure throughput for 1..N workers.
+"""
+
+import argparse
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+
+from errors import WorkerError
+
+logger = logging.getLogger(__name__)
+
+
+def shard_for(session_id: str, workers: int) -> int:
+    """Jump consistent hash of the session id onto [0, workers).
+
+    Stable across processes (unlike hash()), and when the pool grows or
+    shrinks by one worker only about 1/workers of the sessions move.
+    """
+    key = int.from_bytes(hashlib.blake2b(session_id.encode("utf-8"), digest_size=8).digest(), "big")
+    bucket, jump = -1, 0
+    while jump < workers:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def _worker_main(conn, index: int, options: Dict):
+    """Worker process: owns a SessionManager and answers requests in order"""
+    # Imported here so the dispatcher process never loads the engine
+    from chatbot import respond
+    from sessions import SessionManager
+
+    profile_store = None
+    if options.get("db"):
+        from persistence import ProfileStore
+        profile_store = ProfileStore(options["db"])
+    exporter = None
+    if options.get("export_turns"):
+        # One file per worker, so processes never interleave their writes
+        from conversation_log import TurnExporter
+        root, ext = os.path.splitext(options["export_turns"])
+        exporter = TurnExporter(f"{root}.{index}{ext}")
+    manager = SessionManager(max_sessions=options.get("max_sessions", 1000),
+                             ttl=options.get("ttl", 1800.0),
+                             memory_size=options.get("memory_size", 50),
+                             profile_store=profile_store, turn_exporter=exporter)
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                break
+            kind, request_id = request[0], request[1]
+            try:
+                if kind == "chat":
+                    _, _, session_id, user_id, message = request
+                    bot, profile = manager.get(session_id, user_id)
+                    result = respond(message, bot, profile)
+                elif kind == "export":
+                    # Hand over every session that belongs to another worker at the new size.
+                    # Profiles are written first, so the new owner only stores later changes
+                    # and a move that fails half-way loses no saved data.
+                    workers = request[2]
+                    moving = [(session_id, session) for session_id, session in manager.items()
+                              if shard_for(session_id, workers) != index]
+                    if profile_store is not None:
+                        for _, session in moving:
+                            if session.profile.user_id is not None:
+                                profile_store.save(session.profile)
+                        profile_store.flush()
+                    result = []
+                    for session_id, _ in moving:
+                        session = manager.detach(session_id)
+                        if session is not None:
+                            result.append((session_id, session.profile, session.bot.export_state()))
+                elif kind == "import":
+                    for session_id, profile, bot_state in request[2]:
+                        manager.adopt(session_id, profile, bot_state)
+                    result = len(request[2])
+                elif kind == "stats":
+                    result = {"sessions": len(manager)}
+                elif kind == "stop":
+                    conn.send((request_id, True, None))
+                    break
+                else:
+                    raise ValueError(f"Unknown request {kind!r}")
+                conn.send((request_id, True, result))
+            except Exception as e:
+                logger.exception("Worker %d failed on %s", index, kind)
+                conn.send((request_id, False, f"{type(e).__name__}: {e}"))
+    finally:
+        manager.close()
+        if exporter is not None:
+            exporter.close()
+        conn.close()
+
+
+class _Worker:
+    """Dispatcher-side handle: process, pipe, in-flight futures and the reader thread"""
+
+    def __init__(self, index: int, context, options: Dict, on_exit):
+        self.index = index
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, index, options),
+                                       name=f"chat-worker-{index}", daemon=True)
+        self.process.start()
+        self.started = time.monotonic()
+        child_conn.close()
+        self.pending: Dict[int, Future] = {}
+        self.lock = threading.Lock()
+        self.stopping = False
+        self._on_exit = on_exit
+        self.reader = threading.Thread(target=self._read_loop, name=f"chat-worker-{index}-reader",
+                                       daemon=True)
+        self.reader.start()
+
+    def send(self, request_id: int, request: Tuple) -> Future:
+        future = Future()
+        with self.lock:
+            self.pending[request_id] = future
+            try:
+                self.conn.send(request)
+            except (OSError, ValueError) as e:
+                del self.pending[request_id]
+                future.set_exception(WorkerError(f"worker {self.index} is unavailable: {e}"))
+        return future
+
+    def _read_loop(self):
+        while True:
+            try:
+                request_id, ok, result = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            with self.lock:
+                future = self.pending.pop(request_id, None)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(WorkerError(result))
+        # The process is gone: fail whatever it still owed us
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for future in pending.values():
+            future.set_exception(WorkerError(f"worker {self.index} exited"))
+        if not self.stopping:
+            self._on_exit(self)
+
+    def stop(self, timeout: float = 5.0):
+        self.stopping = True
+        if self.process.is_alive():
+            try:
+                self.send(-1, ("stop", -1)).result(timeout)
+            except Exception:
+                pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+
+class ShardedPool:
+    """Front dispatcher for N worker processes, each owning a shard of sessions.
+
+    Messages are forwarded over a pipe to the worker that owns the session
+    (see shard_for), so one session's messages are always answered by the
+    same process, in order. A worker that dies is restarted straight
+    away; its in-flight requests fail with WorkerError and its sessions
+    start fresh unless a profile database (`db`) is configured.
+    resize() moves sessions whose owner changes (profile, conversation
+    memory and follow-up state). If a worker dies during the move, the
+    sessions it was handing over or receiving lose their memory; their
+    profiles were flushed to `db` first and are reloaded from there. With
+    `export_turns`, worker i appends the turns of its sessions to
+    <root>.<i><ext> of that path.
+    """
+
+    def __init__(self, workers: int = None, db: Optional[str] = None, max_sessions: int = 1000,
+                 ttl: float = 1800.0, memory_size: int = 50, start_method: str = "spawn",
+                 export_turns: Optional[str] = None):
+        self.options = {"db": db, "max_sessions": max_sessions, "ttl": ttl, "memory_size": memory_size,
+                        "export_turns": export_turns}
+        self.restarts = 0
+        self._context = multiprocessing.get_context(start_method)
+        self._ids = count()
+        # Held while routing a message and for the whole of a resize
+        self._lock = threading.RLock()
+        self._closed = False
+        self._workers: List[_Worker] = [self._spawn(i) for i in range(workers or multiprocessing.cpu_count())]
+
+    def _spawn(self, index: int) -> _Worker:
+        return _Worker(index, self._context, self.options, self._restart)
+
+    def _restart(self, worker: _Worker):
+        if time.monotonic() - worker.started < 1.0:
+            time.sleep(1.0)  # don't spin if a worker keeps dying on startup
+        with self._lock:
+            if self._closed or worker.index >= len(self._workers) or self._workers[worker.index] is not worker:
+                return
+            logger.warning("Worker %d exited (code %s); restarting", worker.index, worker.process.exitcode)
+            worker.process.join()
+            self._workers[worker.index] = self._spawn(worker.index)
+            self.restarts += 1
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    def submit(self, session_id: str, message: str, user_id: Optional[str] = None) -> Future:
+        """Queue a message; the future resolves to (response, intent)"""
+        request_id = next(self._ids)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("pool is closed")
+            worker = self._workers[shard_for(session_id, len(self._workers))]
+            return worker.send(request_id, ("chat", request_id, session_id, user_id, message))
+
+    def respond(self, session_id: str, message: str, user_id: Optional[str] = None,
+                timeout: Optional[float] = None) -> Tuple[str, str]:
+        return tuple(self.submit(session_id, message, user_id).result(timeout))
+
+    def _call_all(self, kind: str, *args) -> List:
+        futures = []
+        for worker in self._workers:
+            request_id = next(self._ids)
+            futures.append(worker.send(request_id, (kind, request_id) + args))
+        return [future.result() for future in futures]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            per_worker = self._call_all("stats")
+        return {"workers": self.size, "restarts": self.restarts,
+                "sessions": [stats["sessions"] for stats in per_worker]}
+
+    def resize(self, workers: int):
+        """Change the number of workers, moving sessions to their new owners"""
+        if workers < 1:
+            raise ValueError("a pool needs at least one worker")
+        with self._lock:
+            old_size = len(self._workers)
+            if workers == old_size:
+                return
+            for index in range(old_size, workers):
+                self._workers.append(self._spawn(index))
+            # Pipes are FIFO, so earlier chat messages are answered before the export
+            moving: Dict[int, list] = {}
+            for worker in self._workers[:old_size]:
+                request_id = next(self._ids)
+                try:
+                    exported = worker.send(request_id, ("export", request_id, workers)).result()
+                except WorkerError as e:
+                    logger.warning("Worker %d could not hand over its sessions: %s", worker.index, e)
+                    continue
+                for session in exported:
+                    moving.setdefault(shard_for(session[0], workers), []).append(session)
+            for worker in self._workers[workers:]:
+                worker.stop()
+            del self._workers[workers:]
+            futures = []
+            for index, sessions in moving.items():
+                request_id = next(self._ids)
+                futures.append((index, self._workers[index].send(request_id, ("import", request_id, sessions))))
+            for index, future in futures:
+                try:
+                    future.result()
+                except WorkerError as e:
+                    logger.warning("Worker %d could not take over %d sessions: %s", index,
+                                   len(moving[index]), e)
+            logger.info("Resized pool %d -> %d workers, moved %d sessions",
+                        old_size, workers, sum(map(len, moving.values())))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def measure_throughput(workers: int, messages: int, sessions: int = 200) -> float:
+    """Messages per second answered by a pool of the given size"""
+    prompts = ["quick workout", "budget dinner ideas", "I'm stressed", "how much water should I drink",
+               "hello", "sleep tips", "I want to lose weight", "give me a challenge"]
+    with ShardedPool(workers) as pool:
+        for session in range(sessions):  # warm up every worker and session
+            pool.respond(f"session-{session}", "hi")
+        start = time.perf_counter()
+        futures = [pool.submit(f"session-{i % sessions}", prompts[i % len(prompts)]) for i in range(messages)]
+        for future in futures:
+            future.result()
+        return messages / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of the sharded worker pool")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                        help="largest pool size to measure")
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"CPU cores: {multiprocessing.cpu_count()}")
+    baseline = None
+    for size in sorted({1, 2, 4, args.workers} - {0}):
+        if size > args.workers:
+            continue
+        rate = measure_throughput(size, args.messages)
+        baseline = baseline or rate
+        print(f"{size:3d} workers: {rate:9.0f} msg/s  ({rate / baseline:.2f}x)")